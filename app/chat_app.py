@@ -1,70 +1,383 @@
 from textual.app import App, ComposeResult
-from textual.containers import Container, VerticalScroll
-from textual.widgets import Button, Header, Static, TextArea
+from textual.binding import Binding
+from textual.containers import Container, Horizontal, Vertical, VerticalScroll
+from textual.widgets import Button, ContentSwitcher, Header, Static, Tab, Tabs, TextArea
 from textual.reactive import reactive
+from textual.strip import Strip
+from textual.widget import Widget
 from textual import events
 from rich.text import Text
-from rich.panel import Panel
 from rich.markdown import Markdown
+from textual.geometry import Region
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import contextvars
+import itertools
+from models.chat_models import ChatHistory
+from utils.code_blocks import (
+    CODE_THEME, CodeBlock, highlight_cache, pending_highlight_blocks, render_code_block, split_blocks
+)
+from utils.helpers import split_path_argument
+from utils.profiling import timed
+from utils.stream_stats import StreamStats
 
-class ChatMessage(Static):
-    """Widget untuk menampilkan pesan chat"""
+UNREAD_BADGE = " ●"
+
+# Pool bersama untuk parsing dan layout Markdown di luar event loop
+RENDER_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="terai-render")
+
+class ChatMessage(Widget):
+    """Widget untuk menampilkan pesan chat
+
+    Markdown di-parse dan di-layout ke baris segment (Strip) oleh
+    RENDER_POOL untuk lebar saat ini; event loop hanya menyalin baris
+    dari cache, sehingga input tetap responsif saat jawaban besar dirender.
+    Border dan padding digambar oleh Textual (lihat style.css).
+    """
+
+    DEFAULT_CSS = """
+    ChatMessage {
+        height: auto;
+    }
+    """
 
     def __init__(self, message: str, is_user: bool = False, provider: str = ""):
-        super().__init__()
+        super().__init__(classes="user" if is_user else "")
         self.message = message
         self.is_user = is_user
         self.provider = provider
+        self._refresh_pending = False
+        self._highlight_checked = None
+        self._highlighting = False
+        # Cache baris hasil render; _version naik setiap isi berubah
+        self._lines = []
+        self._block_cache = {}
+        self._version = 0
+        self._rendered = None
+        self._rendering = False
+
+    def _block_strips(self, console, options, key, make_renderable, cache: dict, fallback: str = "") -> list:
+        """Strip satu blok; dari cache render sebelumnya jika blok tidak berubah"""
+        key = (key, options.max_width)
+        strips = self._block_cache.get(key)
+        if strips is None:
+            try:
+                renderable = make_renderable()
+                lines = console.render_lines(renderable, options, pad=True)
+            except Exception:
+                # Fallback jika rendering Markdown gagal
+                lines = console.render_lines(Text(fallback, style="cyan"), options, pad=True)
+            strips = [Strip(line, options.max_width) for line in lines]
+        cache[key] = strips
+        return strips
 
-    def render(self) -> Panel:
-        """Render chat message dengan markdown"""
+    @timed("ChatMessage.render", "render")
+    def _render_strips(self, console, message: str, width: int) -> list:
+        """Dijalankan di RENDER_POOL: parse + layout ke Strip per blok markdown
+
+        Blok yang sudah selesai di-cache, sehingga selama streaming hanya
+        blok terakhir yang di-layout ulang.
+        """
+        options = console.options.update_width(width)
+        cache = {}
         if self.is_user:
-            # Gunakan Text untuk pesan pengguna
-            content = Text(f"👤 Anda:\n{self.message}", style="green")
-            return Panel(content, border_style="green")
+            strips = self._block_strips(
+                console, options, ("user", message),
+                lambda: Text(f"👤 Anda:\n{message}", style="green"), cache
+            )
         else:
             provider_tag = f" ({self.provider.upper()})" if self.provider else ""
+            strips = list(self._block_strips(
+                console, options, ("header", provider_tag),
+                lambda: Text(f"🤖 AI{provider_tag}:"), cache
+            ))
+            for block in split_blocks(message):
+                if isinstance(block, CodeBlock):
+                    # Code block besar plain sampai di-highlight oleh worker saat terlihat
+                    highlighted = highlight_cache.get(block)
+                    key = ("code", block.cache_key, highlighted is not None)
+                    make = lambda block=block, highlighted=highlighted: render_code_block(block, highlighted)
+                else:
+                    key = ("md", block)
+                    make = lambda block=block: Markdown(block, code_theme=CODE_THEME)
+                fallback = block if isinstance(block, str) else block.code
+                block_strips = self._block_strips(console, options, key, make, cache, fallback)
+                # Satu baris kosong antar blok (sebagian elemen Rich sudah membawanya)
+                if block_strips and strips[-1].text.strip() and block_strips[0].text.strip():
+                    strips.append(Strip.blank(width))
+                strips.extend(block_strips)
+        # Simpan hanya blok yang masih dipakai
+        self._block_cache = cache
+        return strips
+
+    def schedule_render(self) -> None:
+        """Render ulang di pool jika isi atau lebar berubah (satu job per pesan)"""
+        width = self.size.width
+        if not width or self._rendering or self._rendered == (self._version, width):
+            return
+        self._rendering = True
+        app = self.app
+        version = self._version
+        message = self.message
+
+        def job() -> None:
             try:
-                # Gunakan Markdown untuk pesan AI
-                full_content = f"🤖 AI{provider_tag}:\n\n{self.message}"
-                md_content = Markdown(full_content)
-                return Panel(md_content, border_style="blue")
+                strips = self._render_strips(app.console, message, width)
             except Exception:
-                # Fallback jika rendering Markdown gagal
-                content = Text(f"🤖 AI{provider_tag}: {self.message}", style="cyan")
-                return Panel(content, border_style="blue")
+                strips = [Strip.blank(width)]
+            try:
+                app.call_from_thread(self._render_done, version, width, strips)
+            except Exception:
+                # App sudah berhenti
+                pass
+
+        RENDER_POOL.submit(job)
+
+    def _render_done(self, version: int, width: int, strips: list) -> None:
+        self._rendering = False
+        parent = self.parent
+        at_bottom = parent is not None and parent.scroll_y >= parent.max_scroll_y - 1
+        height_changed = len(strips) != len(self._lines)
+        self._lines = strips
+        self._rendered = (version, width)
+        self.refresh(layout=height_changed)
+        if at_bottom:
+            parent.scroll_end(animate=False)
+        # Isi/lebar berubah selama job berjalan
+        self.schedule_render()
+
+    def get_content_height(self, container, viewport, width: int) -> int:
+        return len(self._lines)
+
+    def render_line(self, y: int) -> Strip:
+        """Hanya menyalin baris dari cache"""
+        width = self.size.width
+        if y >= len(self._lines):
+            return Strip.blank(width)
+        strip = self._lines[y]
+        return strip if strip.cell_length == width else strip.crop_extend(0, width, None)
+
+    def on_mount(self) -> None:
+        self.schedule_render()
+
+    def on_resize(self) -> None:
+        self.schedule_render()
+
+    def append_text(self, text: str) -> None:
+        """Tambahkan text delta dari stream, refresh dibatasi ~10x per detik"""
+        self.message += text
+        self._version += 1
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.set_timer(0.1, self._flush)
+
+    def set_message(self, message: str) -> None:
+        """Ganti isi pesan dan render ulang"""
+        self.message = message
+        self._version += 1
+        self._flush()
+        if isinstance(self.parent, ChatArea):
+            self.call_after_refresh(self.parent.highlight_visible)
+
+    def highlight_pending(self) -> None:
+        """Highlight code block besar di worker thread (dipanggil saat terlihat)"""
+        if self.is_user or self._highlighting or self._highlight_checked is self.message:
+            return
+        self._highlight_checked = self.message
+        blocks = pending_highlight_blocks(self.message)
+        if blocks:
+            self._highlighting = True
+            self.run_worker(lambda: self._highlight_worker(blocks), thread=True, group="highlight")
+
+    def _highlight_worker(self, blocks) -> None:
+        try:
+            for block in blocks:
+                highlight_cache.highlight(block)
+        finally:
+            self.app.call_from_thread(self._highlight_done)
+
+    def _highlight_done(self) -> None:
+        self._highlighting = False
+        # Code block kini ada di highlight cache; layout ulang dengan warna
+        self._version += 1
+        self.schedule_render()
+
+    def _flush(self) -> None:
+        self._refresh_pending = False
+        self.schedule_render()
 
 class ChatArea(VerticalScroll):
     """Area untuk menampilkan history chat"""
-    def add_message(self, message: str, is_user: bool = False, provider: str = ""):
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        self.highlight_visible()
+
+    def on_resize(self) -> None:
+        self.highlight_visible()
+
+    def highlight_visible(self) -> None:
+        """Minta pesan yang masuk viewport untuk highlight code block-nya"""
+        viewport = Region(0, round(self.scroll_y), self.size.width, self.size.height)
+        for child in self.children:
+            if isinstance(child, ChatMessage) and child.virtual_region.overlaps(viewport):
+                child.highlight_pending()
+
+    def add_message(self, message: str, is_user: bool = False, provider: str = "") -> ChatMessage:
         """Tambahkan pesan ke chat area"""
         chat_message = ChatMessage(message, is_user, provider)
         self.mount(chat_message)
         # Scroll ke akhir setelah menambahkan pesan
         self.scroll_end(animate=False)
+        return chat_message
+
+    async def show_history(self, messages, provider: str = "") -> None:
+        """Render ulang chat area dari history (misalnya setelah pindah branch)"""
+        await self.remove_children()
+        for message in messages:
+            self.mount(ChatMessage(message.content, message.role == "user", provider))
+        self.scroll_end(animate=False)
+
+class CompareColumn(Vertical):
+    """Satu kolom compare: header provider/model, statistik dan chat area"""
+
+    def __init__(self, session, **kwargs):
+        super().__init__(classes="compare-column", **kwargs)
+        self.session = session
+
+    def compose(self) -> ComposeResult:
+        yield Static(
+            f"{self.session.current_provider.upper()} • {self.session.current_model}",
+            classes="compare-title"
+        )
+        yield Static("Belum ada data", classes="compare-stats")
+        yield ChatArea(classes="chat-area")
+
+    @property
+    def chat_area(self) -> ChatArea:
+        return self.query_one(ChatArea)
+
+    def show_stats(self, stats: StreamStats) -> None:
+        self.query_one(".compare-stats", Static).update(stats.summary())
+
+class QueuedPrompt:
+    """Prompt yang menunggu giliran di antrian sebuah sesi"""
+
+    def __init__(self, item_id: int, session_id: str, text: str):
+        self.id = item_id
+        self.session_id = session_id
+        self.text = text
+
+class QueueItem(Horizontal):
+    """Satu baris antrian dengan tombol edit dan batal"""
+
+    def __init__(self, item: QueuedPrompt, editing: bool = False):
+        super().__init__(classes="queue-item")
+        self.item = item
+        self.editing = editing
+
+    def compose(self) -> ComposeResult:
+        preview = " ".join(self.item.text.split())
+        if len(preview) > 80:
+            preview = preview[:77] + "..."
+        prefix = "✎" if self.editing else "⏳"
+        yield Static(f"{prefix} {preview}", classes="queue-text")
+        yield Button("Edit", classes="queue-button queue-edit")
+        yield Button("Batal", classes="queue-button queue-cancel")
 
 # Dummy ChatHandler untuk membuat aplikasi bisa berjalan
+class DummyChatSession:
+    def __init__(self, provider: str = "gemini", model: str = "flash"):
+        self.current_provider = provider
+        self.current_model = model
+        self.history = ChatHistory()
+
+    def get_ai_response(self, user_message: str, on_chunk=None) -> str:
+        # Simulasi respons AI
+        response = f"Saya menerima pesan Anda: '{user_message}'. Respons ini berasal dari {self.current_provider.upper()} model {self.current_model}."
+        if on_chunk:
+            for word in response.split(" "):
+                on_chunk(word + " ")
+        self.history.add_message("user", user_message)
+        self.history.add_message("assistant", response)
+        return response
+
+    def fork(self, name: str = None) -> str:
+        return self.history.fork(name)
+
+    def switch_branch(self, name: str) -> bool:
+        return self.history.switch(name)
+
+    def rewind(self):
+        rewound = self.history.rewind()
+        return (rewound[0].content, rewound[1]) if rewound else None
+
+    def set_provider(self, provider: str) -> bool:
+        self.current_provider = provider
+        return True
+
+    attachments = {}
+
+    def attach(self, path: str):
+        raise ValueError("lampiran tidak tersedia di mode dummy")
+
+    def detach(self, attachment_id: str) -> bool:
+        return False
+
+    async def map_reduce(self, path: str, instruction: str, on_progress=None) -> str:
+        raise ValueError("mapreduce tidak tersedia di mode dummy")
+
+    def set_model(self, model: str) -> bool:
+        self.current_model = model
+        return True
+
+class DummyCompareSession:
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.current_provider = "compare"
+        self.current_model = " vs ".join(session.current_model for session in sessions)
+
 class DummyChatHandler:
     def __init__(self):
         self.current_provider = "gemini"
         self.current_model = "flash"
 
+    def create_session(self, inherit_history: bool = False) -> DummyChatSession:
+        return DummyChatSession(self.current_provider, self.current_model)
+
+    def create_compare_session(self, specs):
+        sessions = [DummyChatSession(*spec.split(":", 1)) for spec in specs if ":" in spec]
+        return DummyCompareSession(sessions), []
+
     def _get_ai_response(self, user_message: str) -> str:
-        # Simulasi respons AI
-        return f"Saya menerima pesan Anda: '{user_message}'. Respons ini berasal dari {self.current_provider.upper()} model {self.current_model}."
+        return self.create_session().get_ai_response(user_message)
 
 class ChatApp(App):
-    """Aplikasi Chat dengan Textual - Working Ctrl+Enter"""
+    """Aplikasi Chat dengan Textual - tabbed sessions"""
     CSS_PATH = "style.css"
+    BINDINGS = [
+        ("ctrl+t", "new_session", "Tab baru"),
+        # priority: TextArea juga memakai ctrl+w (hapus kata)
+        Binding("ctrl+w", "close_session", "Tutup tab", priority=True),
+    ]
     current_provider = reactive("")
     current_model = reactive("")
     chat_handler = None
-    welcome_shown = False
 
     def __init__(self, chat_handler, **kwargs):
         super().__init__(**kwargs)
         self.chat_handler = chat_handler
+        # Sesi per tab, key = tab id
+        self.sessions = {}
+        self.session_titles = {}
+        self.busy_sessions = set()
+        # Antrian type-ahead per sesi, dijalankan berurutan setelah giliran sebelumnya
+        self.queues = {}
+        self.editing = None
+        self._queue_ids = itertools.count(1)
+        self._queue_panel_lock = asyncio.Lock()
+        self._session_counter = 0
+        # Referensi task background supaya tidak di-garbage-collect di tengah jalan
+        self._tasks = set()
         # Inisialisasi reactive state
         self.current_provider = chat_handler.current_provider
         self.current_model = chat_handler.current_model
@@ -72,7 +385,9 @@ class ChatApp(App):
     def compose(self) -> ComposeResult:
         """Compose the app UI"""
         yield Header()
-        yield ChatArea(id="chat-area")
+        yield Tabs(id="session-tabs")
+        yield ContentSwitcher(id="sessions")
+        yield Vertical(id="queue-panel")
 
         with Container(id="input-container"):
             yield TextArea(
@@ -87,36 +402,130 @@ class ChatApp(App):
                   classes="send-button"
               )
 
-    def on_mount(self) -> None:
+    async def on_mount(self) -> None:
         """Called when app starts"""
         self.title = "Terai"
-        self.sub_title = f"{self.current_model} • ctrl+q (exit)"
+
+        # Tab pertama memakai history sesi utama
+        await self.add_session(self.chat_handler.create_session(inherit_history=True))
 
         # Focus on textarea
         textarea = self.query_one("#text-input", TextArea)
         textarea.focus()
 
-        # Add welcome message hanya sekali di awal
-        if not self.welcome_shown:
-            chat_area = self.query_one("#chat-area")
-            # Pastikan Static welcome message tidak memiliki class "thinking"
-            welcome_msg = "Selamat datang! Saya adalah asisten AI Anda. Apa yang bisa saya bantu hari ini?"
-            welcome_static = Static(welcome_msg, classes="welcome-message")
-            chat_area.mount(welcome_static)
-            self.welcome_shown = True
-            chat_area.scroll_end(animate=False)
+    async def add_session(self, session) -> str:
+        """Tambahkan tab baru untuk sebuah sesi"""
+        self._session_counter += 1
+        session_id = f"session-{self._session_counter}"
+        self.sessions[session_id] = session
+        self.session_titles[session_id] = f"Sesi {self._session_counter}"
+        self.queues[session_id] = []
+
+        chat_area = ChatArea(id=f"chat-{session_id}", classes="chat-area")
+        await self.query_one("#sessions", ContentSwitcher).mount(chat_area)
+
+        # Add welcome message sekali per tab
+        welcome_msg = "Selamat datang! Saya adalah asisten AI Anda. Apa yang bisa saya bantu hari ini?"
+        chat_area.mount(Static(welcome_msg, classes="welcome-message"))
+
+        await self._add_tab(session_id)
+        return session_id
+
+    async def add_compare_session(self, compare_session) -> str:
+        """Tambahkan tab compare: satu kolom per pasangan provider/model"""
+        self._session_counter += 1
+        session_id = f"session-{self._session_counter}"
+        self.sessions[session_id] = compare_session
+        self.session_titles[session_id] = f"Bandingkan {len(compare_session.sessions)}"
+        self.queues[session_id] = []
+
+        columns = Horizontal(
+            *(CompareColumn(session) for session in compare_session.sessions),
+            id=f"chat-{session_id}",
+            classes="compare-columns"
+        )
+        await self.query_one("#sessions", ContentSwitcher).mount(columns)
+        await self._add_tab(session_id)
+        return session_id
+
+    async def _add_tab(self, session_id: str) -> None:
+        tabs = self.query_one("#session-tabs", Tabs)
+        await tabs.add_tab(Tab(self.session_titles[session_id], id=session_id))
+        tabs.active = session_id
+
+    @property
+    def active_session_id(self) -> str:
+        return self.query_one("#session-tabs", Tabs).active
+
+    def _chat_area(self, session_id: str) -> ChatArea:
+        return self.query_one(f"#chat-{session_id}", ChatArea)
+
+    def _message_area(self, session_id: str) -> ChatArea:
+        """Chat area untuk pesan sistem (kolom pertama pada tab compare)"""
+        container = self.query_one(f"#chat-{session_id}")
+        return container if isinstance(container, ChatArea) else container.query(ChatArea).first()
+
+    def _is_compare(self, session_id: str) -> bool:
+        return hasattr(self.sessions.get(session_id), "sessions")
+
+    def _update_subtitle(self) -> None:
+        session = self.sessions.get(self.active_session_id)
+        if session:
+            self.current_provider = session.current_provider
+            self.current_model = session.current_model
+        self.sub_title = f"{self.current_provider.upper()} • {self.current_model} • ctrl+t (tab baru) • ctrl+q (exit)"
+
+    async def on_tabs_tab_activated(self, event: Tabs.TabActivated) -> None:
+        """Pindah tab: tampilkan chat area dan antriannya, hapus badge unread"""
+        if event.tab is None:
+            return
+        session_id = event.tab.id
+        self.query_one("#sessions", ContentSwitcher).current = f"chat-{session_id}"
+        event.tab.label = self.session_titles[session_id]
+        self._update_subtitle()
+        await self.refresh_queue_panel()
+
+    async def action_new_session(self) -> None:
+        """Buka tab sesi baru"""
+        await self.add_session(self.chat_handler.create_session())
+        self.query_one("#text-input", TextArea).focus()
+
+    async def action_close_session(self) -> None:
+        """Tutup tab aktif (minimal satu tab tetap terbuka)"""
+        if len(self.sessions) <= 1:
+            return
+        session_id = self.active_session_id
+        await self.query_one("#session-tabs", Tabs).remove_tab(session_id)
+        await self.query_one(f"#chat-{session_id}").remove()
+        self.sessions.pop(session_id, None)
+        self.session_titles.pop(session_id, None)
+        self.queues.pop(session_id, None)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Jalankan coroutine sebagai task background yang referensinya disimpan"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
 
     async def on_key(self, event: events.Key) -> None:
         """Handle Ctrl+Enter untuk kirim pesan"""
         # Cek jika Ctrl+Enter ditekan
         if event.key == "ctrl+j" or event.key == "ctrl+enter":
-            await self.send_message()
+            # Jangan block message loop, supaya stream tab lain tetap jalan
+            self._spawn(self.send_message())
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handler saat tombol diklik."""
         if event.button.id == "send-button":
             # Panggil handler kirim pesan
-            asyncio.create_task(self.send_message())
+            self._spawn(self.send_message())
+        elif isinstance(event.button.parent, QueueItem):
+            item = event.button.parent.item
+            if event.button.has_class("queue-edit"):
+                self.edit_queued(item)
+            else:
+                self.cancel_queued(item)
 
     async def send_message(self) -> None:
         """Handle message sending"""
@@ -129,8 +538,91 @@ class ChatApp(App):
         # Clear textarea
         textarea.text = ""
 
+        if self.editing:
+            # Simpan hasil edit di posisi antrian yang sama
+            item, self.editing = self.editing, None
+            if item in self.queues.get(item.session_id, []):
+                item.text = message
+                await self.refresh_queue_panel()
+                return
+
+        await self.enqueue(self.active_session_id, message)
+
+    async def enqueue(self, session_id: str, message: str) -> None:
+        """Jalankan pesan sekarang, atau antrikan jika sesi masih menjawab"""
+        if session_id in self.busy_sessions:
+            self.queues[session_id].append(QueuedPrompt(next(self._queue_ids), session_id, message))
+            await self.refresh_queue_panel()
+            return
+        # Tandai busy sebelum task jalan supaya kiriman berikutnya ikut antri
+        self.busy_sessions.add(session_id)
+        self._spawn(self._run_queue(session_id, message))
+
+    async def _run_queue(self, session_id: str, message: str) -> None:
+        """Proses pesan lalu antrian sesi ini satu per satu, sesuai urutan"""
+        try:
+            while message is not None and session_id in self.sessions:
+                await self.process_message(session_id, message)
+                queue = self.queues.get(session_id)
+                message = queue.pop(0).text if queue else None
+                if message is not None:
+                    await self.refresh_queue_panel()
+        finally:
+            self.busy_sessions.discard(session_id)
+
+    def edit_queued(self, item: QueuedPrompt) -> None:
+        """Muat prompt antrian ke input; kirim ulang untuk menyimpan perubahan"""
+        self.editing = item
+        textarea = self.query_one("#text-input", TextArea)
+        textarea.text = item.text
+        textarea.focus()
+        self._spawn(self.refresh_queue_panel())
+
+    def cancel_queued(self, item: QueuedPrompt) -> None:
+        """Hapus prompt dari antrian"""
+        queue = self.queues.get(item.session_id, [])
+        if item in queue:
+            queue.remove(item)
+        if self.editing is item:
+            self.editing = None
+            self.query_one("#text-input", TextArea).text = ""
+        self._spawn(self.refresh_queue_panel())
+
+    async def refresh_queue_panel(self) -> None:
+        """Tampilkan antrian tab aktif di atas input"""
+        async with self._queue_panel_lock:
+            panel = self.query_one("#queue-panel", Vertical)
+            await panel.remove_children()
+            queue = self.queues.get(self.active_session_id, [])
+            panel.display = bool(queue)
+            if queue:
+                await panel.mount(*(QueueItem(item, item is self.editing) for item in queue))
+
+    async def process_message(self, session_id: str, message: str) -> None:
+        """Proses satu pesan sesi: perintah, compare atau chat biasa"""
+        if message.startswith("/compare"):
+            await self._start_compare(session_id, message)
+            return
+        if message.split()[0] in ("/attach", "/detach"):
+            await self._handle_attach(session_id, message)
+            return
+        if message.split()[0] in ("/fork", "/branch", "/regenerate"):
+            await self._handle_branch(session_id, message)
+            return
+        if message.split()[0] == "/mapreduce":
+            await self._handle_mapreduce(session_id, message)
+            return
+        if self._is_compare(session_id):
+            await self.compare_response(session_id, message)
+            return
+        if self._handle_session_command(session_id, message):
+            return
+        await self._send_chat(session_id, message)
+
+    async def _send_chat(self, session_id: str, message: str) -> None:
+        """Tampilkan pesan user lalu stream jawaban AI"""
         # Add user message to chat
-        chat_area = self.query_one("#chat-area")
+        chat_area = self._chat_area(session_id)
         chat_area.add_message(message, is_user=True)
 
         # Show thinking indicator
@@ -138,37 +630,244 @@ class ChatApp(App):
         chat_area.mount(thinking_msg)
         chat_area.scroll_end(animate=False)
 
-        # Get AI response
-        await self.get_ai_response(message, thinking_msg)
+        # Get AI response; stream tab lain tetap berjalan di background
+        await self.get_ai_response(session_id, message, thinking_msg)
+
+    async def _start_compare(self, session_id: str, message: str) -> None:
+        """/compare provider:model provider:model ... membuka tab compare"""
+        specs = message.split()[1:]
+        compare_session, errors = self.chat_handler.create_compare_session(specs)
+        if len(compare_session.sessions) < 2:
+            errors.append("Gunakan: /compare <provider:model> <provider:model> ...")
+        if errors:
+            chat_area = self._message_area(session_id)
+            for error in errors:
+                chat_area.mount(Static(f"❌ {error}", classes="system-message"))
+            chat_area.scroll_end(animate=False)
+            return
+        await self.add_compare_session(compare_session)
 
-    async def get_ai_response(self, user_message: str, thinking_msg: Static) -> None:
+    async def compare_response(self, session_id: str, user_message: str) -> None:
+        """Kirim satu prompt ke semua kolom secara bersamaan"""
+        columns = list(self.query_one(f"#chat-{session_id}").query(CompareColumn))
+        if user_message.startswith(("/provider", "/model")):
+            for column in columns:
+                column.chat_area.mount(Static("ℹ️ Tab compare memakai pasangan tetap; buka /compare baru untuk mengganti", classes="system-message"))
+            return
+
+        async def run_column(column: CompareColumn) -> None:
+            chat_area = column.chat_area
+            chat_area.add_message(user_message, is_user=True)
+            thinking_msg = Static("🤖 AI sedang mengetik...", classes="thinking")
+            chat_area.mount(thinking_msg)
+            chat_area.scroll_end(animate=False)
+            stats = StreamStats()
+            await self._stream_reply(column.session, chat_area, user_message, thinking_msg, stats)
+            column.show_stats(stats)
+
+        try:
+            await asyncio.gather(*(run_column(column) for column in columns))
+        finally:
+            self._mark_unread(session_id)
+
+    async def _handle_branch(self, session_id: str, message: str) -> None:
+        """/fork [nama], /branch [nama] dan /regenerate [model]"""
+        command, _, arg = message.partition(" ")
+        arg = arg.strip()
+        chat_area = self._message_area(session_id)
+        session = self.sessions[session_id]
+
+        if self._is_compare(session_id):
+            info = "ℹ️ Branch belum tersedia di tab compare"
+        elif command == "/fork":
+            name = session.fork(arg or None)
+            info = f"🌿 Branch '{name}' dibuat dari {session.history.length} pesan"
+        elif command == "/branch":
+            if not arg:
+                history = session.history
+                info = "\n".join(
+                    f"{'▶' if name == history.branch else ' '} {name} ({node.depth if node else 0} pesan)"
+                    for name, node in history.branches.items()
+                )
+            elif session.switch_branch(arg):
+                await chat_area.show_history(session.history.messages, session.current_provider)
+                info = f"🌿 Pindah ke branch '{arg}'"
+            else:
+                info = f"❌ Branch '{arg}' tidak ada"
+        elif arg and not session.set_model(arg):
+            info = f"❌ Model '{arg}' tidak tersedia"
+        else:
+            # /regenerate: jawaban lama tetap bisa dibuka lewat /branch
+            rewound = session.rewind()
+            if rewound:
+                user_message, saved = rewound
+                await chat_area.show_history(session.history.messages, session.current_provider)
+                chat_area.mount(Static(f"🔁 Jawaban lama disimpan di branch '{saved}'", classes="system-message"))
+                self._update_subtitle()
+                await self._send_chat(session_id, user_message)
+                return
+            info = "❌ Belum ada jawaban untuk di-regenerate"
+
+        chat_area.mount(Static(info, classes="system-message"))
+        chat_area.scroll_end(animate=False)
+
+    async def _handle_attach(self, session_id: str, message: str) -> None:
+        """/attach <path> meng-index file; /detach <id> melepasnya"""
+        command, _, arg = message.partition(" ")
+        arg = arg.strip()
+        session = self.sessions[session_id]
+        # Tab compare: lampiran berlaku untuk semua kolom
+        targets = getattr(session, "sessions", [session])
+        chat_area = self._message_area(session_id)
+
+        if not arg:
+            attached = targets[0].attachments.values()
+            lines = [f"📎 {attachment.describe()}" for attachment in attached] or ["Belum ada lampiran"]
+            lines.append(f"Gunakan: {command} <{'path' if command == '/attach' else 'id'}>")
+            info = "\n".join(lines)
+        elif command == "/detach":
+            ok = all([target.detach(arg) for target in targets])
+            info = f"🗑️ Lampiran {arg} dilepas" if ok else f"❌ Lampiran '{arg}' tidak ada"
+        else:
+            indexing = Static(f"📎 Meng-index {arg}...", classes="thinking")
+            chat_area.mount(indexing)
+            chat_area.scroll_end(animate=False)
+            loop = asyncio.get_running_loop()
+            try:
+                for target in targets:
+                    attachment = await loop.run_in_executor(None, target.attach, arg)
+                info = f"📎 Lampiran {attachment.describe()}"
+            except Exception as e:
+                info = f"❌ Gagal melampirkan {arg}: {e}"
+            indexing.remove()
+
+        chat_area.mount(Static(info, classes="system-message"))
+        chat_area.scroll_end(animate=False)
+
+    async def _handle_mapreduce(self, session_id: str, message: str) -> None:
+        """/mapreduce <file> <instruksi>: map per chunk lalu reduce bertingkat"""
+        path, instruction = split_path_argument(message[len("/mapreduce"):])
+        session = self.sessions[session_id]
+        chat_area = self._message_area(session_id)
+        if self._is_compare(session_id):
+            chat_area.mount(Static("ℹ️ /mapreduce tidak tersedia di tab compare", classes="system-message"))
+            chat_area.scroll_end(animate=False)
+            return
+        if not path or not instruction:
+            chat_area.mount(Static("Gunakan: /mapreduce <file> <instruksi>", classes="system-message"))
+            chat_area.scroll_end(animate=False)
+            return
+
+        chat_area.add_message(message, is_user=True)
+        progress = Static(f"🗺️ Memproses {path}...", classes="thinking")
+        chat_area.mount(progress)
+        chat_area.scroll_end(animate=False)
+        try:
+            result = await session.map_reduce(path, instruction, progress.update)
+            progress.remove()
+            chat_area.add_message(result, is_user=False, provider="mapreduce")
+        except Exception as e:
+            progress.remove()
+            chat_area.mount(Static(
+                f"❌ MapReduce gagal: {e}\nHasil chunk yang selesai tersimpan; jalankan ulang perintah yang sama untuk melanjutkan",
+                classes="system-message"
+            ))
+        chat_area.scroll_end(animate=False)
+
+    def _handle_session_command(self, session_id: str, message: str) -> bool:
+        """Handle perintah sesi: /provider <nama> dan /model <nama>"""
+        parts = message.split()
+        if parts[0] not in ("/provider", "/model"):
+            return False
+
+        session = self.sessions[session_id]
+        chat_area = self._chat_area(session_id)
+        if len(parts) != 2:
+            chat_area.mount(Static(f"Gunakan: {parts[0]} <nama>", classes="system-message"))
+            return True
+
+        if parts[0] == "/provider":
+            ok = session.set_provider(parts[1].lower())
+        else:
+            ok = session.set_model(parts[1])
+
+        if ok:
+            info = f"🔄 Sesi ini memakai {session.current_provider.upper()} • {session.current_model}"
+        else:
+            info = f"❌ {parts[0][1:].capitalize()} '{parts[1]}' tidak tersedia"
+        chat_area.mount(Static(info, classes="system-message"))
+        chat_area.scroll_end(animate=False)
+        self._update_subtitle()
+        return True
+
+    async def get_ai_response(self, session_id: str, user_message: str, thinking_msg: Static) -> None:
         """Get AI response asynchronously"""
-        chat_area = self.query_one("#chat-area")
+        try:
+            await self._stream_reply(
+                self.sessions[session_id],
+                self._chat_area(session_id),
+                user_message,
+                thinking_msg
+            )
+        finally:
+            self._mark_unread(session_id)
+
+    async def _stream_reply(self, session, chat_area: ChatArea, user_message: str, thinking_msg: Static, stats: StreamStats = None) -> None:
+        """Stream response sebuah sesi ke chat area"""
+        provider = session.current_provider
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        ai_msg = None
+
+        def on_chunk(text: str) -> None:
+            # Dipanggil dari executor thread, dijalankan kembali di context app
+            if stats:
+                stats.on_chunk(text)
+            loop.call_soon_threadsafe(append_chunk, text, context=context)
+
+        def label() -> str:
+            # Provider 'auto': tampilkan model yang dipilih router
+            route = getattr(session, "last_route", None)
+            return f"{provider} → {route[1]}" if provider == "auto" and route else provider
+
+        def append_chunk(text: str) -> None:
+            nonlocal ai_msg
+            if ai_msg is None:
+                # Hapus pesan 'sedang mengetik'
+                thinking_msg.remove()
+                ai_msg = chat_area.add_message("", is_user=False, provider=label())
+            ai_msg.append_text(text)
 
         try:
-            # Hapus pesan 'sedang mengetik'
-            thinking_msg.remove()
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, self._get_sync_response, user_message
+            response = await loop.run_in_executor(
+                None, session.get_ai_response, user_message, on_chunk
             )
+            if stats:
+                stats.finish()
+                stats.usage = getattr(session, "last_usage", None)
 
-            if response:
-                chat_area.add_message(response, is_user=False, provider=self.current_provider)
-            else:
-                 chat_area.add_message("Tidak ada respons dari AI.", is_user=False, provider=self.current_provider)
+            if ai_msg is None:
+                thinking_msg.remove()
+                ai_msg = chat_area.add_message("", is_user=False, provider=label())
+            ai_msg.set_message(response or "Tidak ada respons dari AI.")
+            warning = getattr(session, "last_warning", "")
+            if warning:
+                chat_area.mount(Static(f"⚠️ {warning}", classes="system-message"))
 
         except Exception as e:
-            thinking_msg.remove()
-            chat_area.add_message(f"Error: {str(e)}", is_user=False, provider=self.current_provider)
+            if ai_msg is None:
+                thinking_msg.remove()
+            chat_area.add_message(f"Error: {str(e)}", is_user=False, provider=provider)
 
-    def _get_sync_response(self, user_message: str) -> str:
-        # Panggil metode dari chat_handler
-        return self.chat_handler._get_ai_response(user_message)
+    def _mark_unread(self, session_id: str) -> None:
+        """Beri badge unread jika respons selesai di tab background"""
+        if session_id not in self.sessions or session_id == self.active_session_id:
+            return
+        tab = self.query_one("#session-tabs", Tabs).query_one(f"#{session_id}", Tab)
+        tab.label = self.session_titles[session_id] + UNREAD_BADGE
 
 if __name__ == "__main__":
     # Inisialisasi handler dummy
     handler = DummyChatHandler()
     app = ChatApp(chat_handler=handler)
     app.run()
-
-
@@ -1,7 +1,23 @@
 # clients/__init__.py
+import asyncio
+import threading
+import time
 from .base_client import BaseAIClient
 from .gemini_client import GeminiClient
 from .openai_client import OpenAIClientWrapper
+from .openai_compatible import OpenAICompatibleClient
+from .model_catalog import ModelCatalog
+from .retry import RetryPolicy
+from .deadline import DeadlinePolicy, DeadlineExceeded
+from .single_flight import SingleFlight, AsyncSingleFlight, request_key
+from .cassette_client import RecordingClient, ReplayClient, parse_replay_speed
+from .usage_tracker import UsageTracker, BudgetExceeded, estimate_tokens
+from .router import LatencyRouter, AUTO_PROVIDER
+from models.chat_models import Usage
+from utils.stream_stats import StreamStats
+
+# Nama provider yang tidak boleh dipakai instance kompatibel OpenAI
+RESERVED_PROVIDERS = ("gemini", "openai", "replay", AUTO_PROVIDER)
 
 class ClientManager:
     """Manager for all AI clients"""
@@ -10,7 +26,16 @@ class ClientManager:
         self.settings = settings
         self.console = console
         self.clients = {}
+        # Dibuat sebelum setup_clients: provider kompatibel OpenAI memakai model dari cache
+        self.model_catalog = ModelCatalog(settings)
         self.setup_clients()
+        # Request identik yang overlap berbagi satu stream upstream
+        self.single_flight = SingleFlight()
+        self.async_single_flight = AsyncSingleFlight()
+        self.usage_tracker = UsageTracker(settings)
+        # Skor latency per provider/model untuk provider 'auto'
+        self.router = LatencyRouter(settings)
+        self._keep_warm_thread = None
     
     def setup_clients(self):
         """Initialize available clients"""
@@ -18,7 +43,8 @@ class ClientManager:
             try:
                 self.clients["gemini"] = GeminiClient(
                     self.settings.gemini_api_key, 
-                    self.console
+                    self.console,
+                    self.settings.keepalive_expiry
                 )
                 self.console.print("✅ Gemini client initialized")
             except Exception as e:
@@ -28,14 +54,71 @@ class ClientManager:
             try:
                 self.clients["openai"] = OpenAIClientWrapper(
                     self.settings.openai_api_key,
-                    self.console
+                    self.console,
+                    self.settings.keepalive_expiry
                 )
                 self.console.print("✅ OpenAI client initialized")
             except Exception as e:
                 self.console.print(f"❌ OpenAI setup failed: {e}")
         
+        for name, config in self.settings.compat_providers.items():
+            try:
+                self.clients[name] = self._create_compat_client(name, config)
+                self.console.print(f"✅ {name} client initialized ({config['base_url']})")
+            except Exception as e:
+                self.console.print(f"❌ {name} setup failed: {e}")
+        
+        if self.settings.replay_dir:
+            try:
+                self.clients["replay"] = ReplayClient(
+                    self.settings.replay_dir,
+                    parse_replay_speed(self.settings.replay_speed),
+                    self.console
+                )
+                self.console.print("✅ Replay client initialized")
+            except Exception as e:
+                self.console.print(f"❌ Replay setup failed: {e}")
+        
         if not self.clients:
             raise ValueError("No AI providers configured!")
+        
+        retry_policy = RetryPolicy.from_settings(self.settings)
+        deadline_policy = DeadlinePolicy.from_settings(self.settings)
+        for client in self.clients.values():
+            client.retry_policy = retry_policy
+            client.deadline_policy = deadline_policy
+            client.temperature = self.settings.temperature
+            client.max_tokens = self.settings.max_tokens
+        
+        if self.settings.record_dir:
+            # Rekam semua stream provider asli ke cassette
+            for provider, client in list(self.clients.items()):
+                if provider != "replay":
+                    self.clients[provider] = RecordingClient(
+                        client, provider, self.settings.record_dir, self.console
+                    )
+            self.console.print(f"⏺️  Merekam stream ke {self.settings.record_dir}")
+    
+    def _create_compat_client(self, name: str, config: dict) -> OpenAICompatibleClient:
+        """Client untuk satu instance TERAI_COMPAT_PROVIDERS"""
+        if name in RESERVED_PROVIDERS:
+            raise ValueError(f"nama '{name}' sudah dipakai provider bawaan")
+        if not config["base_url"]:
+            raise ValueError(f"TERAI_COMPAT_{name.upper().replace('-', '_')}_BASE_URL belum di-set")
+        # Model dari konfigurasi, lalu cache catalog; jika keduanya kosong, discovery
+        # /v1/models dilakukan ModelCatalog di background (startup tidak menunggu network)
+        cached = self.model_catalog.get_models(name) or {}
+        models = config["models"] or [info["name"] for info in cached.values()]
+        return OpenAICompatibleClient(
+            name,
+            config["base_url"],
+            config["api_key"],
+            self.console,
+            models=models,
+            max_connections=config["max_connections"],
+            tier=config["tier"],
+            keepalive_expiry=self.settings.keepalive_expiry
+        )
     
     def get_available_providers(self):
         """Get available providers"""
@@ -44,10 +127,157 @@ class ClientManager:
     def get_client(self, provider: str):
         """Get client by provider name"""
         return self.clients.get(provider)
+    
+    def get_models(self, provider: str) -> dict:
+        """Get models dari cache catalog, fallback ke daftar bawaan client"""
+        cached = self.model_catalog.get_models(provider)
+        if cached:
+            return cached
+        client = self.get_client(provider)
+        return client.available_models if client else {}
+    
+    def default_model(self, provider: str, discover: bool = False) -> str:
+        """Model default provider: Settings.default_<provider>_model, model
+        pertama daftar bawaan client (bukan hasil catalog yang urut alfabet),
+        lalu model pertama di catalog.
+        
+        "" jika belum ada model yang diketahui (provider kompatibel OpenAI
+        sebelum discovery selesai); dengan `discover`, /v1/models di-fetch
+        sekarang dan ValueError dilempar jika tetap kosong.
+        """
+        default = getattr(self.settings, f"default_{provider}_model", None)
+        if default:
+            return default
+        client = self.get_client(provider)
+        models = client.available_models or self.get_models(provider)
+        if not models and discover:
+            self.model_catalog.refresh({provider: client}, force=True)
+            models = self.get_models(provider)
+            if not models:
+                raise ValueError(f"Belum ada model untuk provider '{provider}'")
+        return list(models.values())[0]["name"] if models else ""
+    
+    def provider_for_model(self, model: str):
+        """Provider pertama yang menyediakan `model`, None jika tidak ada"""
+        for provider, client in self.clients.items():
+            models = list(self.get_models(provider).values()) + list(client.available_models.values())
+            if any(info["name"] == model for info in models):
+                return provider
+        return None
+    
+    def refresh_models_in_background(self, force: bool = False):
+        """Refresh catalog model tanpa memblokir startup"""
+        return self.model_catalog.refresh_in_background(self.clients, force)
+    
+    def start_keep_warm(self):
+        """Request ringan berkala ke setiap provider (TERAI_KEEP_WARM_INTERVAL > 0)
+        
+        Menjaga koneksi pool tetap hidup di antara request daemon yang jarang.
+        """
+        interval = self.settings.keep_warm_interval
+        if interval <= 0 or self._keep_warm_thread:
+            return None
+
+        def keep_warm_loop():
+            while True:
+                time.sleep(interval)
+                for client in list(self.clients.values()):
+                    try:
+                        client.keep_warm()
+                    except Exception:
+                        pass
+
+        self._keep_warm_thread = threading.Thread(target=keep_warm_loop, name="terai-keep-warm", daemon=True)
+        self._keep_warm_thread.start()
+        return self._keep_warm_thread
+    
+    def route(self, tier: str = None):
+        """(provider, model) tercepat yang sehat untuk tier kualitas (default TERAI_ROUTE_TIER)"""
+        return self.router.choose(self, tier)
+    
+    def start_route_probes(self):
+        """Mulai probe latency di background (TERAI_ROUTE_PROBE_INTERVAL > 0)"""
+        return self.router.start_probes(self)
+    
+    def check_budget(self, messages) -> str:
+        """Cek budget token sebelum request; lihat UsageTracker.check_budget"""
+        return self.usage_tracker.check_budget(estimate_tokens(messages, self.settings.max_tokens))
+    
+    def _metered(self, stream, provider: str, model: str, session: str):
+        """Catat Usage dan latency stream upstream (sekali, juga saat digabung)"""
+        stats = StreamStats()
+        try:
+            for item in stream:
+                if isinstance(item, Usage):
+                    stats.usage = item
+                    self.usage_tracker.record(session, provider, model, item)
+                else:
+                    stats.on_chunk(item)
+                yield item
+        except Exception as e:
+            self.router.observe_error(provider, model, e)
+            raise
+        stats.finish()
+        self.router.observe_stream(provider, model, stats)
+    
+    async def _ametered(self, stream, provider: str, model: str, session: str):
+        stats = StreamStats()
+        try:
+            async for item in stream:
+                if isinstance(item, Usage):
+                    stats.usage = item
+                    # Tulis ke SQLite di thread supaya event loop tidak tertahan
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self.usage_tracker.record, session, provider, model, item
+                    )
+                else:
+                    stats.on_chunk(item)
+                yield item
+        except Exception as e:
+            self.router.observe_error(provider, model, e)
+            raise
+        stats.finish()
+        self.router.observe_stream(provider, model, stats)
+    
+    def iter_text(self, provider: str, messages, model: str, session: str = ""):
+        """Stream text deltas dari provider (dipakai bersama oleh semua sesi)
+        
+        Item terakhir bisa berupa `Usage` jika provider melaporkannya.
+        """
+        client = self.get_client(provider)
+        if not client:
+            raise ValueError(f"Provider '{provider}' tidak tersedia")
+        return self.single_flight.stream(
+            request_key(provider, model, messages),
+            lambda: self._metered(client.iter_text(messages, model), provider, model, session)
+        )
+    
+    def aiter_text(self, provider: str, messages, model: str, session: str = "", retry_policy: RetryPolicy = None):
+        """Async versi iter_text (untuk server asyncio); lihat BaseAIClient.aiter_text"""
+        client = self.get_client(provider)
+        if not client:
+            raise ValueError(f"Provider '{provider}' tidak tersedia")
+        return self.async_single_flight.stream(
+            request_key(provider, model, messages),
+            lambda: self._ametered(client.aiter_text(messages, model, retry_policy), provider, model, session)
+        )
 
 __all__ = [
     'BaseAIClient',
     'GeminiClient', 
     'OpenAIClientWrapper',
+    'OpenAICompatibleClient',
+    'ModelCatalog',
+    'RetryPolicy',
+    'DeadlinePolicy',
+    'DeadlineExceeded',
+    'SingleFlight',
+    'AsyncSingleFlight',
+    'RecordingClient',
+    'ReplayClient',
+    'UsageTracker',
+    'BudgetExceeded',
+    'LatencyRouter',
+    'AUTO_PROVIDER',
     'ClientManager'
 ]
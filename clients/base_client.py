@@ -1,5 +1,29 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
+import httpx
 from rich.console import Console
+from utils.formatters import extract_text_from_chunk
+from utils.async_stream import iterate_in_thread
+from models.chat_models import Usage
+from .retry import RetryPolicy, ResumeState
+from .deadline import DeadlinePolicy
+
+# Idle keep-alive default httpx (5s) terlalu pendek untuk daemon: koneksi pool
+# sudah ditutup sebelum request berikutnya datang
+KEEPALIVE_EXPIRY = 300.0
+
+# Timeout read bawaan SDK, dipakai jika deadline tidak membatasi read
+READ_TIMEOUT = 600.0
+
+def http_limits(keepalive_expiry: float = KEEPALIVE_EXPIRY, max_connections: int = 1000,
+                max_keepalive_connections: int = 100) -> httpx.Limits:
+    """Batas connection pool httpx client provider (default sama dengan SDK OpenAI)"""
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
 
 class BaseAIClient(ABC):
     """Abstract base class for AI clients"""
@@ -7,10 +31,137 @@ class BaseAIClient(ABC):
     def __init__(self, console: Console):
         self.console = console
         self.available_models = {}
+        self.retry_policy = RetryPolicy()
+        self.deadline_policy = DeadlinePolicy()
+        # Parameter generasi (di-set dari Settings oleh ClientManager)
+        self.temperature = 0.7
+        self.max_tokens = 2000
+        self._async_client = None
+        self._async_loop = None
+
+    @abstractmethod
+    def create_stream(self, messages, model: str):
+        """Create raw streaming request to AI provider"""
+        pass
+
+    @abstractmethod
+    def build_continuation(self, messages, partial: str):
+        """Build messages untuk melanjutkan response yang terputus"""
+        pass
+
+    def _loop_client(self, create):
+        """Async client untuk event loop yang sedang berjalan
+        
+        Koneksi httpx terikat ke loop pembuatnya (Textual dan asyncio.run bisa
+        dijalankan ulang dengan loop baru), jadi client dibuat ulang jika loop
+        berganti.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = create()
+            self._async_loop = loop
+        return self._async_client
+
+    def keep_warm(self):
+        """Request ringan supaya koneksi di pool tidak ditutup karena idle"""
+        pass
+
+    def extract_usage(self, chunk) -> Usage:
+        """Usage dari chunk provider, None jika chunk tidak membawa usage"""
+        return None
+
+    def _iter_chunks(self, stream):
+        """Text deltas dari raw stream, lalu Usage jika ada"""
+        usage = None
+        for chunk in stream:
+            usage = self.extract_usage(chunk) or usage
+            text_chunk = extract_text_from_chunk(chunk)
+            if text_chunk:
+                yield text_chunk
+        if usage:
+            yield usage
+
+    def _iter_attempt(self, messages, model: str, deadline=None):
+        """Satu percobaan stream dengan deadline model ini"""
+        deadline = deadline or self.deadline_policy.for_model(model)
+        return self._iter_chunks(deadline.iter(lambda: self.create_stream(messages, model)))
+
+    async def _aiter_attempt(self, messages, model: str):
+        """Satu percobaan stream async; default membaca create_stream di executor thread
+        
+        Deadline async dipasang oleh aiter_text.
+        """
+        async for text_chunk in iterate_in_thread(lambda: self._iter_chunks(self.create_stream(messages, model))):
+            yield text_chunk
+
+    def _resume_messages(self, messages, state: ResumeState):
+        received = state.received
+        return self.build_continuation(messages, received) if received else messages
+
+    def iter_text(self, messages, model: str):
+        """Yield text deltas tanpa rendering
+        
+        Stream yang putus dilanjutkan otomatis: prefix yang sudah diterima
+        dikirim kembali dan continuation disambung ke text sebelumnya.
+        Item terakhir berupa `Usage` (gabungan semua percobaan) jika provider
+        melaporkannya. Deadline yang terlewati melempar DeadlineExceeded
+        setelah text yang sudah diterima diteruskan.
+        """
+        state = ResumeState(self.retry_policy)
+        deadline = self.deadline_policy.for_model(model)
+        while True:
+            try:
+                for text_chunk in self._iter_attempt(self._resume_messages(messages, state), model, deadline):
+                    if isinstance(text_chunk, Usage):
+                        state.add_usage(text_chunk)
+                        continue
+                    text_chunk = state.feed(text_chunk)
+                    if text_chunk:
+                        yield text_chunk
+                text_chunk = state.flush()
+                if text_chunk:
+                    yield text_chunk
+                if state.usage:
+                    yield state.usage
+                return
+            except Exception as e:
+                text_chunk = state.flush()
+                if text_chunk:
+                    yield text_chunk
+                time.sleep(state.next_delay(e))
+
+    async def aiter_text(self, messages, model: str, retry_policy: RetryPolicy = None):
+        """Async versi iter_text, dengan resume yang sama
+        
+        `retry_policy` mengganti policy client untuk request ini (misalnya
+        tanpa retry jika pemanggil punya retry sendiri).
+        """
+        state = ResumeState(retry_policy or self.retry_policy)
+        deadline = self.deadline_policy.for_model(model)
+        while True:
+            try:
+                async for text_chunk in deadline.aiter(self._aiter_attempt(self._resume_messages(messages, state), model)):
+                    if isinstance(text_chunk, Usage):
+                        state.add_usage(text_chunk)
+                        continue
+                    text_chunk = state.feed(text_chunk)
+                    if text_chunk:
+                        yield text_chunk
+                text_chunk = state.flush()
+                if text_chunk:
+                    yield text_chunk
+                if state.usage:
+                    yield state.usage
+                return
+            except Exception as e:
+                text_chunk = state.flush()
+                if text_chunk:
+                    yield text_chunk
+                await asyncio.sleep(state.next_delay(e))
 
     @abstractmethod
-    def stream_response(self, messages, model: str, use_markdown: bool = True):
-        """Stream response from AI provider"""
+    def stream_response(self, messages, model: str, use_markdown: bool = True, stream=None):
+        """Stream response from AI provider (atau render `stream` yang sudah dibuat)"""
         pass
 
     @abstractmethod
@@ -18,6 +169,10 @@ class BaseAIClient(ABC):
         """Get available models for this provider"""
         pass
 
+    def fetch_models(self) -> list:
+        """Fetch model list dari endpoint list-models provider"""
+        return []
+
     @abstractmethod
     def validate_connection(self) -> bool:
         """Validate connection to AI service"""
@@ -0,0 +1,230 @@
+# clients/cassette_client.py
+import asyncio
+import glob
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from rich.console import Console
+from .base_client import BaseAIClient
+from .retry import RetryPolicy
+from models.chat_models import Usage
+
+CASSETTE_VERSION = 1
+CASSETTE_SUFFIX = ".cassette.gz"
+
+def conversation_key(messages) -> str:
+    """Key cassette dari isi pesan saja, supaya format provider tidak berpengaruh"""
+    contents = [msg.get("content", "") if isinstance(msg, dict) else str(msg) for msg in messages]
+    return hashlib.sha256(json.dumps(contents).encode("utf-8")).hexdigest()
+
+def parse_replay_speed(value) -> float:
+    """'original' = 1.0, 'max' = 0 (tanpa delay), angka = skala kecepatan (2 = 2x lebih cepat)"""
+    if value in (None, "", "original"):
+        return 1.0
+    if value == "max":
+        return 0.0
+    return float(value)
+
+class Cassette:
+    """Rekaman satu stream: text chunk beserta jeda antar chunk"""
+
+    def __init__(self, provider: str, model: str, key: str, chunks: list, usage: dict = None):
+        self.provider = provider
+        self.model = model
+        self.key = key
+        # [[delay_ms, text], ...]; delay chunk pertama = time-to-first-token
+        self.chunks = chunks
+        # Token usage asli dari provider (jika dilaporkan)
+        self.usage = usage
+
+    @property
+    def text(self) -> str:
+        return "".join(text for _, text in self.chunks)
+
+    def save(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{self.provider}-{self.key[:12]}-{os.urandom(2).hex()}{CASSETTE_SUFFIX}"
+        )
+        payload = {
+            "v": CASSETTE_VERSION,
+            "provider": self.provider,
+            "model": self.model,
+            "key": self.key,
+            "chunks": self.chunks,
+            "usage": self.usage
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(payload["provider"], payload["model"], payload["key"], payload["chunks"], payload.get("usage"))
+
+class RecordingClient(BaseAIClient):
+    """Wrapper yang meneruskan stream client asli sambil merekamnya ke cassette"""
+
+    def __init__(self, inner: BaseAIClient, provider: str, record_dir: str, console: Console):
+        super().__init__(console)
+        self.inner = inner
+        self.provider = provider
+        self.record_dir = record_dir
+        self.available_models = inner.available_models
+        self.retry_policy = inner.retry_policy
+
+    def create_stream(self, messages, model: str):
+        return self.inner.create_stream(messages, model)
+
+    def build_continuation(self, messages, partial: str):
+        return self.inner.build_continuation(messages, partial)
+
+    def keep_warm(self):
+        self.inner.keep_warm()
+
+    def fetch_models(self) -> list:
+        return self.inner.fetch_models()
+
+    @property
+    def quality_tier(self) -> str:
+        """Tier instance provider kompatibel OpenAI (untuk provider 'auto')"""
+        return getattr(self.inner, "quality_tier", "")
+
+    def _recorder(self, messages, model: str):
+        chunks = []
+        usage = {}
+        last = time.perf_counter()
+
+        def record(text_chunk):
+            nonlocal last
+            if isinstance(text_chunk, Usage):
+                usage.update(vars(text_chunk))
+                return
+            now = time.perf_counter()
+            chunks.append([round((now - last) * 1000, 1), text_chunk])
+            last = now
+
+        def save():
+            if chunks:
+                Cassette(self.provider, model, conversation_key(messages), chunks, usage or None).save(self.record_dir)
+
+        return record, save
+
+    def iter_text(self, messages, model: str):
+        """Stream dari client asli (termasuk resume), direkam per chunk"""
+        record, save = self._recorder(messages, model)
+        for text_chunk in self.inner.iter_text(messages, model):
+            record(text_chunk)
+            yield text_chunk
+        save()
+
+    async def aiter_text(self, messages, model: str, retry_policy: RetryPolicy = None):
+        record, save = self._recorder(messages, model)
+        async for text_chunk in self.inner.aiter_text(messages, model, retry_policy):
+            record(text_chunk)
+            yield text_chunk
+        save()
+
+    def stream_response(self, messages, model: str, use_markdown: bool = True, stream=None):
+        """Stream response dengan rendering console, sambil merekam"""
+        from handlers.stream_handler import StreamHandler  # Import di dalam method
+
+        try:
+            return StreamHandler(self.console).handle_stream(stream if stream is not None else self.iter_text(messages, model), use_markdown)
+        except Exception as e:
+            self.console.print(f"❌ [red]{self.provider.capitalize()} Error: {e}[/red]")
+            return None
+
+    def get_available_models(self) -> dict:
+        return self.inner.get_available_models()
+
+    def validate_connection(self) -> bool:
+        return self.inner.validate_connection()
+
+class ReplayClient(BaseAIClient):
+    """Provider offline yang memutar ulang cassette hasil rekaman
+    
+    Request dicocokkan dengan isi percakapan; jika tidak ada yang cocok,
+    cassette diputar bergiliran supaya traffic mirip produksi tetap bisa
+    dijalankan lewat StreamHandler dan UI.
+    """
+
+    def __init__(self, replay_dir: str, speed: float, console: Console):
+        super().__init__(console)
+        self.replay_dir = replay_dir
+        self.speed = speed
+        self.cassettes = [
+            Cassette.load(path)
+            for path in sorted(glob.glob(os.path.join(replay_dir, f"*{CASSETTE_SUFFIX}")))
+        ]
+        if not self.cassettes:
+            raise ValueError(f"Tidak ada cassette di {replay_dir}")
+        self.by_key = {}
+        for cassette in self.cassettes:
+            self.by_key.setdefault(cassette.key, []).append(cassette)
+        self._next = itertools.cycle(self.cassettes)
+        self._lock = threading.Lock()
+        self.available_models = self.get_available_models()
+
+    def get_available_models(self) -> dict:
+        models = sorted({cassette.model for cassette in self.cassettes})
+        return {
+            str(i+1): {"name": name, "description": "Replay cassette"}
+            for i, name in enumerate(models)
+        }
+
+    def select(self, messages, model: str) -> Cassette:
+        """Cassette yang cocok (utamakan model yang sama), selain itu bergiliran"""
+        matches = self.by_key.get(conversation_key(messages))
+        if matches:
+            same_model = [cassette for cassette in matches if cassette.model == model]
+            return (same_model or matches)[0]
+        with self._lock:
+            return next(self._next)
+
+    def _delay(self, delay_ms: float) -> float:
+        return delay_ms / 1000 / self.speed if self.speed else 0.0
+
+    def create_stream(self, messages, model: str):
+        cassette = self.select(messages, model)
+        for delay_ms, text_chunk in cassette.chunks:
+            delay = self._delay(delay_ms)
+            if delay:
+                time.sleep(delay)
+            yield text_chunk
+        if cassette.usage:
+            yield Usage(**cassette.usage)
+
+    def extract_usage(self, chunk) -> Usage:
+        return chunk if isinstance(chunk, Usage) else None
+
+    async def _aiter_attempt(self, messages, model: str):
+        cassette = self.select(messages, model)
+        for delay_ms, text_chunk in cassette.chunks:
+            await asyncio.sleep(self._delay(delay_ms))
+            yield text_chunk
+        if cassette.usage:
+            yield Usage(**cassette.usage)
+
+    def build_continuation(self, messages, partial: str):
+        return messages
+
+    def stream_response(self, messages, model: str, use_markdown: bool = True, stream=None):
+        """Replay response dengan rendering console"""
+        from handlers.stream_handler import StreamHandler  # Import di dalam method
+
+        try:
+            return StreamHandler(self.console).handle_stream(stream if stream is not None else self.iter_text(messages, model), use_markdown, "magenta")
+        except Exception as e:
+            self.console.print(f"❌ [red]Replay Error: {e}[/red]")
+            return None
+
+    def validate_connection(self) -> bool:
+        return True
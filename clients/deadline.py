@@ -0,0 +1,232 @@
+# clients/deadline.py
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field, fields, replace
+
+PHASE_NAMES = {
+    "connect": "koneksi",
+    "first_token": "token pertama",
+    "stall": "jeda antar chunk",
+    "total": "total waktu"
+}
+
+_OPENED, _CHUNK, _END, _ERROR = range(4)
+
+# Callback "stream terbuka" milik thread pompa yang sedang berjalan
+_pump = threading.local()
+
+def mark_opened():
+    """Tandai fase connect selesai dari dalam open_stream (mis. hook response httpx)
+
+    Untuk SDK yang baru mengirim request saat chunk pertama diminta; di luar
+    thread pompa tidak melakukan apa-apa.
+    """
+    callback = getattr(_pump, "opened", None)
+    if callback:
+        callback()
+
+class DeadlineExceeded(Exception):
+    """Stream dibatalkan karena melewati deadline (tidak di-retry)"""
+
+    def __init__(self, phase: str, limit: float):
+        self.phase = phase
+        self.limit = limit
+        super().__init__(f"Deadline {PHASE_NAMES[phase]} {limit:g}s terlewati")
+
+@dataclass
+class Deadlines:
+    """Batas waktu satu request dalam detik (0 = tanpa batas)"""
+    connect: float = 0.0
+    first_token: float = 0.0
+    stall: float = 0.0
+    total: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return any((self.connect, self.first_token, self.stall, self.total))
+
+    @property
+    def read_timeout(self) -> float:
+        """Batas atas satu read socket, supaya thread pompa tidak menggantung selamanya"""
+        return max(self.first_token, self.stall) or self.total
+
+def parse_model_deadlines(spec: str, default: Deadlines) -> dict:
+    """'model:first_token=60,total=600;model2:stall=10' -> {model: Deadlines}"""
+    names = {f.name for f in fields(Deadlines)}
+    per_model = {}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(";"))):
+        model, _, overrides = entry.partition(":")
+        values = {}
+        for item in filter(None, (part.strip() for part in overrides.split(","))):
+            key, _, value = item.partition("=")
+            if key.strip() not in names:
+                raise ValueError(f"Deadline '{key.strip()}' tidak dikenal (pilih: {', '.join(sorted(names))})")
+            values[key.strip()] = float(value)
+        per_model[model.strip()] = replace(default, **values)
+    return per_model
+
+@dataclass
+class DeadlinePolicy:
+    """Deadline default plus override per model"""
+    default: Deadlines = field(default_factory=Deadlines)
+    per_model: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls, settings) -> "DeadlinePolicy":
+        default = Deadlines(
+            connect=settings.connect_timeout,
+            first_token=settings.first_token_timeout,
+            stall=settings.stall_timeout,
+            total=settings.total_timeout
+        )
+        return cls(default, parse_model_deadlines(settings.model_deadlines, default))
+
+    def for_model(self, model: str) -> "StreamDeadline":
+        """Jam deadline baru untuk satu request ke `model`"""
+        return StreamDeadline(self.per_model.get(model, self.default))
+
+class StreamDeadline:
+    """Jam deadline satu request stream
+
+    Fase berjalan connect -> first_token -> stall dan dimulai ulang di setiap
+    percobaan (retry/resume); total dihitung dari awal request. Saat deadline
+    terdekat lewat, stream ditutup dan DeadlineExceeded dilempar ke consumer,
+    sehingga thread pemanggil tidak ikut menggantung.
+    """
+
+    def __init__(self, deadlines: Deadlines):
+        self.deadlines = deadlines
+        self.started = time.monotonic()
+        self.restart()
+
+    def restart(self):
+        """Mulai fase percobaan baru"""
+        self.attempt_started = time.monotonic()
+        self.phase = "connect"
+        self.last_chunk = None
+
+    def nearest(self):
+        """(fase, detik tersisa) untuk deadline terdekat; (None, None) jika tidak ada"""
+        limits = self.deadlines
+        candidates = []
+        if limits.total:
+            candidates.append(("total", self.started + limits.total))
+        if self.phase == "connect" and limits.connect:
+            candidates.append(("connect", self.attempt_started + limits.connect))
+        if self.phase in ("connect", "first_token") and limits.first_token:
+            candidates.append(("first_token", self.attempt_started + limits.first_token))
+        if self.phase == "stall" and limits.stall:
+            candidates.append(("stall", self.last_chunk + limits.stall))
+        if not candidates:
+            return None, None
+        phase, at = min(candidates, key=lambda candidate: candidate[1])
+        return phase, max(at - time.monotonic(), 0.0)
+
+    def opened(self):
+        if self.phase == "connect":
+            self.phase = "first_token"
+
+    def tick(self):
+        self.phase = "stall"
+        self.last_chunk = time.monotonic()
+
+    def exceeded(self, phase: str) -> DeadlineExceeded:
+        return DeadlineExceeded(phase, getattr(self.deadlines, phase))
+
+    def iter(self, open_stream):
+        """Iterasi raw stream blocking dengan deadline
+
+        Stream dibuka dan dibaca di thread pompa; consumer menunggu dengan
+        timeout fase aktif dan langsung lepas saat deadline lewat. Thread
+        pompa berhenti di chunk berikutnya (atau saat read timeout HTTP).
+        Tanpa deadline, stream dibaca langsung.
+        """
+        if not self.deadlines.enabled:
+            yield from open_stream()
+            return
+
+        self.restart()
+        items = queue.SimpleQueue()
+        cancelled = threading.Event()
+
+        def pump():
+            stream = None
+            _pump.opened = lambda: items.put((_OPENED, None))
+            try:
+                stream = open_stream()
+                items.put((_OPENED, None))
+                for chunk in stream:
+                    if cancelled.is_set():
+                        break
+                    items.put((_CHUNK, chunk))
+                items.put((_END, None))
+            except Exception as e:
+                items.put((_ERROR, e))
+            finally:
+                _pump.opened = None
+                # Ditutup di thread ini: close dari thread lain bisa membuat read macet
+                if cancelled.is_set():
+                    _close(stream)
+
+        threading.Thread(target=pump, name="terai-stream", daemon=True).start()
+        finished = False
+        try:
+            while True:
+                phase, remaining = self.nearest()
+                try:
+                    kind, value = items.get(timeout=remaining)
+                except queue.Empty:
+                    raise self.exceeded(phase)
+                if kind == _OPENED:
+                    self.opened()
+                elif kind == _CHUNK:
+                    self.tick()
+                    yield value
+                elif kind == _END:
+                    finished = True
+                    return
+                else:
+                    finished = True
+                    raise value
+        finally:
+            if not finished:
+                cancelled.set()
+
+    async def aiter(self, stream):
+        """Iterasi async stream dengan deadline (asyncio.timeout per chunk)
+
+        Koneksi async dibatasi timeout HTTP client; di sini fase dimulai
+        dari menunggu token pertama.
+        """
+        if not self.deadlines.enabled:
+            async for item in stream:
+                yield item
+            return
+
+        self.restart()
+        self.opened()
+        try:
+            while True:
+                phase, remaining = self.nearest()
+                try:
+                    async with asyncio.timeout(remaining):
+                        item = await stream.__anext__()
+                except StopAsyncIteration:
+                    return
+                except TimeoutError:
+                    raise self.exceeded(phase)
+                self.tick()
+                yield item
+        finally:
+            await stream.aclose()
+
+def _close(stream):
+    """Tutup raw stream (melepas koneksi HTTP ke pool)"""
+    close = getattr(stream, "close", None)
+    if close:
+        try:
+            close()
+        except Exception:
+            pass
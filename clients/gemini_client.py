@@ -1,25 +1,64 @@
 # clients/gemini_client.py
+import math
+import httpx
 from google import genai as google_genai
 from google.genai import types as google_types
 from rich.console import Console
-from .base_client import BaseAIClient
+from .base_client import BaseAIClient, KEEPALIVE_EXPIRY, READ_TIMEOUT, http_limits
+from .deadline import mark_opened
+from .retry import CONTINUE_PROMPT
+from models.chat_models import Usage
+from utils.formatters import extract_text_from_chunk
+
+def _prepend(first, stream):
+    """Chunk pertama lalu sisa stream; close() tetap sampai ke stream SDK"""
+    yield first
+    yield from stream
 
 class GeminiClient(BaseAIClient):
     """Google Gemini client implementation"""
     
-    def __init__(self, api_key: str, console: Console):
+    def __init__(self, api_key: str, console: Console, keepalive_expiry: float = KEEPALIVE_EXPIRY):
         super().__init__(console)
-        self.client = google_genai.Client(api_key=api_key)
+        # httpx client sendiri (timeout dan redirect seperti default SDK) supaya
+        # keep-alive bisa diatur; timeout per request diisi dari deadline model.
+        # Hook response menandai fase connect selesai saat header diterima
+        self.api_key = api_key
+        self.limits = http_limits(keepalive_expiry)
+        self.client = google_genai.Client(
+            api_key=api_key,
+            http_options=google_types.HttpOptions(
+                httpx_client=httpx.Client(
+                    limits=self.limits,
+                    timeout=None,
+                    follow_redirects=True,
+                    event_hooks={"response": [lambda response: mark_opened()]}
+                )
+            )
+        )
         self.available_models = self.get_available_models()
         
     def get_available_models(self) -> dict:
         return {
             "1": {"name": "gemini-2.0-flash", "description": "Fast & efficient"},
-            "2": {"name": "gemini-1.5-flash", "description": "Balanced performance"},
-            "3": {"name": "gemini-1.5-pro", "description": "Most capable"},
-            "4": {"name": "gemini-2.0-flash-exp", "description": "Experimental"}
+            "2": {"name": "gemini-2.5-flash", "description": "Balanced performance"},
+            "3": {"name": "gemini-2.5-pro", "description": "Most capable"},
+            "4": {"name": "gemini-2.0-flash-lite", "description": "Lowest latency"}
         }
     
+    def fetch_models(self) -> list:
+        """Fetch model yang mendukung generateContent"""
+        models = []
+        for model in self.client.models.list():
+            actions = model.supported_actions or []
+            if "generateContent" not in actions:
+                continue
+            models.append({
+                "name": model.name.removeprefix("models/"),
+                "description": model.display_name or ""
+            })
+        return models
+    
     def validate_connection(self) -> bool:
         try:
             test_response = self.client.models.generate_content(
@@ -30,21 +69,100 @@ class GeminiClient(BaseAIClient):
         except Exception:
             return False
     
-    def stream_response(self, messages, model: str, use_markdown: bool = True):
+    @property
+    def async_client(self):
+        """client.aio per event loop; tetap httpx walau aiohttp terpasang"""
+        return self._loop_client(lambda: google_genai.Client(
+            api_key=self.api_key,
+            http_options=google_types.HttpOptions(
+                httpx_async_client=httpx.AsyncClient(limits=self.limits, timeout=None, follow_redirects=True)
+            )
+        ).aio)
+    
+    def keep_warm(self):
+        """Satu halaman models.list: cukup untuk menjaga koneksi TLS tetap hidup"""
+        self.client.models.list(config={"page_size": 1})
+    
+    def _generation_config(self, model: str) -> google_types.GenerateContentConfig:
+        """Parameter generasi dari Settings plus timeout HTTP dari deadline model
+
+        SDK hanya menerima satu timeout (ms) untuk connect dan read; header
+        X-Server-Timeout diisi total waktu agar server tidak memotong jawaban
+        panjang di batas read.
+        """
+        config = google_types.GenerateContentConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_tokens,
+        )
+        deadlines = self.deadline_policy.for_model(model).deadlines
+        if deadlines.enabled:
+            timeout = max(deadlines.connect, deadlines.read_timeout) or READ_TIMEOUT
+            config.http_options = google_types.HttpOptions(
+                timeout=int(timeout * 1000),
+                headers={"X-Server-Timeout": str(math.ceil(max(deadlines.total, timeout)))}
+            )
+        return config
+    
+    def create_stream(self, messages, model: str):
+        """Create raw Gemini stream
+
+        Generator SDK baru mengirim request saat chunk pertama diminta, jadi
+        chunk pertama diambil di sini agar deadline connect meliputi request
+        yang sebenarnya.
+        """
+        stream = self.client.models.generate_content_stream(
+            model=model,
+            contents=messages,
+            config=self._generation_config(model)
+        )
+        first = next(stream, None)
+        if first is None:
+            return iter(())
+        return _prepend(first, stream)
+    
+    def extract_usage(self, chunk) -> Usage:
+        """usage_metadata bersifat kumulatif; chunk terakhir yang dipakai"""
+        metadata = getattr(chunk, "usage_metadata", None)
+        if not metadata:
+            return None
+        return Usage(
+            prompt_tokens=metadata.prompt_token_count or 0,
+            completion_tokens=metadata.candidates_token_count or 0,
+            cached_tokens=metadata.cached_content_token_count or 0
+        )
+    
+    async def _aiter_attempt(self, messages, model: str):
+        """Async text deltas lewat client.aio (tanpa thread per stream)"""
+        stream = await self.async_client.models.generate_content_stream(
+            model=model,
+            contents=messages,
+            config=self._generation_config(model)
+        )
+        usage = None
+        async for chunk in stream:
+            usage = self.extract_usage(chunk) or usage
+            text_chunk = extract_text_from_chunk(chunk)
+            if text_chunk:
+                yield text_chunk
+        if usage:
+            yield usage
+    
+    def build_continuation(self, messages, partial: str):
+        """Partial model turn + instruksi untuk melanjutkan"""
+        return list(messages) + [
+            google_types.Content(role="model", parts=[google_types.Part(text=partial)]),
+            CONTINUE_PROMPT
+        ]
+    
+    def stream_response(self, messages, model: str, use_markdown: bool = True, stream=None):
         """Stream response from Gemini"""
         from handlers.stream_handler import StreamHandler  # Import di dalam method
         
         stream_handler = StreamHandler(self.console)
         
         try:
-            chunks = self.client.models.generate_content_stream(
-                model=model,
-                contents=messages,
-                config=google_types.GenerateContentConfig(
-                    temperature=0.7,
-                    max_output_tokens=2000,
-                )
-            )
+            # iter_text melanjutkan stream yang putus di tengah jalan
+            chunks = stream if stream is not None else self.iter_text(messages, model)
             
             return stream_handler.handle_gemini_stream(chunks, use_markdown)
             
@@ -0,0 +1,78 @@
+# clients/model_catalog.py
+import json
+import os
+import threading
+import time
+
+class ModelCatalog:
+    """Daftar model per provider, di-cache di disk dengan TTL
+    
+    Pembacaan selalu dari cache lokal (tanpa network), sedangkan refresh
+    dari endpoint list-models tiap provider berjalan di background thread.
+    """
+    
+    def __init__(self, settings):
+        self.settings = settings
+        self.cache_path = os.path.join(settings.cache_dir, "models.json")
+        self.ttl = settings.model_cache_ttl
+        self._lock = threading.Lock()
+        self._data = self._load()
+    
+    def _load(self) -> dict:
+        """Load cache dari disk, cache rusak/tidak ada dianggap kosong"""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _save(self):
+        """Tulis cache secara atomic"""
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.cache_path)
+    
+    def is_fresh(self, provider: str) -> bool:
+        """Cek apakah cache provider masih dalam TTL"""
+        entry = self._data.get(provider)
+        return bool(entry) and time.time() - entry.get("fetched_at", 0) < self.ttl
+    
+    def get_models(self, provider: str) -> dict:
+        """Get model dari cache dalam format menu ("1": {...}), None jika kosong"""
+        entry = self._data.get(provider)
+        if not entry or not entry.get("models"):
+            return None
+        return {str(i+1): model for i, model in enumerate(entry["models"])}
+    
+    def update(self, provider: str, models: list):
+        """Simpan hasil fetch untuk satu provider"""
+        with self._lock:
+            self._data[provider] = {"fetched_at": time.time(), "models": models}
+            self._save()
+    
+    def refresh(self, clients: dict, force: bool = False):
+        """Fetch model dari provider yang cache-nya kedaluwarsa"""
+        for provider, client in clients.items():
+            if not force and self.is_fresh(provider):
+                continue
+            try:
+                models = client.fetch_models()
+            except Exception:
+                # Offline / API error: tetap pakai cache lama atau daftar bawaan
+                continue
+            if models:
+                self.update(provider, models)
+    
+    def refresh_in_background(self, clients: dict, force: bool = False) -> threading.Thread:
+        """Jalankan refresh di daemon thread supaya startup tidak menunggu network"""
+        thread = threading.Thread(
+            target=self.refresh,
+            args=(dict(clients), force),
+            name="terai-model-catalog",
+            daemon=True
+        )
+        thread.start()
+        return thread
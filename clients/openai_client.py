@@ -1,24 +1,47 @@
 # clients/openai_client.py
-from openai import OpenAI as OpenAIClient
+import json
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI as OpenAIClient, Timeout
 from rich.console import Console
-from .base_client import BaseAIClient
+from .base_client import BaseAIClient, KEEPALIVE_EXPIRY, READ_TIMEOUT, http_limits
+from .retry import CONTINUE_PROMPT
+from models.chat_models import Usage
+
+# Timeout request keep-warm (models.list)
+KEEP_WARM_TIMEOUT = 10.0
+
+# Model non-chat yang ikut dikembalikan oleh /v1/models
+NON_CHAT_MARKERS = ("audio", "realtime", "transcribe", "tts", "image", "search", "embedding")
 
 class OpenAIClientWrapper(BaseAIClient):
     """OpenAI client implementation"""
     
-    def __init__(self, api_key: str, console: Console):
+    def __init__(self, api_key: str, console: Console, keepalive_expiry: float = KEEPALIVE_EXPIRY):
         super().__init__(console)
-        self.client = OpenAIClient(api_key=api_key)
+        self.api_key = api_key
+        self.limits = http_limits(keepalive_expiry)
+        self.client = OpenAIClient(api_key=api_key, http_client=DefaultHttpxClient(limits=self.limits))
         self.available_models = self.get_available_models()
     
     def get_available_models(self) -> dict:
         return {
             "1": {"name": "gpt-4o", "description": "Latest GPT-4 model"},
             "2": {"name": "gpt-4o-mini", "description": "Fast & cost-effective"},
-            "3": {"name": "gpt-4-turbo", "description": "Previous generation"},
-            "4": {"name": "gpt-3.5-turbo", "description": "Legacy model"}
+            "3": {"name": "gpt-4.1", "description": "Long context"},
+            "4": {"name": "gpt-4.1-mini", "description": "Balanced performance"}
         }
     
+    def fetch_models(self) -> list:
+        """Fetch chat model dari /v1/models"""
+        models = []
+        for model in self.client.models.list():
+            name = model.id
+            if not name.startswith(("gpt-", "o1", "o3", "o4", "chatgpt-")):
+                continue
+            if any(marker in name for marker in NON_CHAT_MARKERS):
+                continue
+            models.append({"name": name, "description": model.owned_by or ""})
+        return sorted(models, key=lambda m: m["name"])
+    
     def validate_connection(self) -> bool:
         try:
             test_response = self.client.chat.completions.create(
@@ -30,20 +53,104 @@ class OpenAIClientWrapper(BaseAIClient):
         except Exception:
             return False
     
-    def stream_response(self, messages, model: str, use_markdown: bool = True):
+    def keep_warm(self):
+        """models.list tanpa retry: cukup untuk menjaga koneksi TLS tetap hidup"""
+        self.client.with_options(max_retries=0, timeout=KEEP_WARM_TIMEOUT).models.list()
+    
+    def _request_options(self, model: str) -> dict:
+        """Parameter generasi dari Settings plus timeout HTTP dari deadline model"""
+        options = {"temperature": self.temperature, "max_tokens": self.max_tokens}
+        deadlines = self.deadline_policy.for_model(model).deadlines
+        if deadlines.enabled:
+            options["timeout"] = Timeout(
+                deadlines.read_timeout or READ_TIMEOUT,
+                connect=deadlines.connect or None
+            )
+        return options
+    
+    def create_stream(self, messages, model: str):
+        """Create raw OpenAI stream"""
+        return self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **self._request_options(model)
+        )
+    
+    def extract_usage(self, chunk) -> Usage:
+        """Chunk terakhir membawa usage jika include_usage aktif"""
+        usage = getattr(chunk, "usage", None)
+        if not usage:
+            return None
+        details = getattr(usage, "prompt_tokens_details", None)
+        return Usage(
+            prompt_tokens=usage.prompt_tokens or 0,
+            completion_tokens=usage.completion_tokens or 0,
+            cached_tokens=(getattr(details, "cached_tokens", 0) or 0) if details else 0
+        )
+    
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Async client (per event loop) dengan connection pool sendiri"""
+        return self._loop_client(lambda: AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=DefaultAsyncHttpxClient(limits=self.limits)
+        ))
+    
+    async def _aiter_attempt(self, messages, model: str):
+        """Async text deltas tanpa thread per stream
+        
+        Baris SSE di-parse langsung dengan json, melewati konstruksi model
+        pydantic SDK per chunk yang mendominasi CPU pada banyak stream.
+        """
+        async with self.async_client.chat.completions.with_streaming_response.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **self._request_options(model)
+        ) as response:
+            async for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                payload = json.loads(data)
+                if payload.get("error"):
+                    raise RuntimeError(payload["error"].get("message", "Upstream error"))
+                if payload.get("usage"):
+                    usage = payload["usage"]
+                    details = usage.get("prompt_tokens_details") or {}
+                    yield Usage(
+                        prompt_tokens=usage.get("prompt_tokens") or 0,
+                        completion_tokens=usage.get("completion_tokens") or 0,
+                        cached_tokens=details.get("cached_tokens") or 0
+                    )
+                choices = payload.get("choices")
+                if choices:
+                    text_chunk = (choices[0].get("delta") or {}).get("content")
+                    if text_chunk:
+                        yield text_chunk
+    
+    def build_continuation(self, messages, partial: str):
+        """Partial assistant turn + instruksi untuk melanjutkan"""
+        return list(messages) + [
+            {"role": "assistant", "content": partial},
+            {"role": "user", "content": CONTINUE_PROMPT}
+        ]
+    
+    def stream_response(self, messages, model: str, use_markdown: bool = True, stream=None):
         """Stream response from OpenAI"""
         from handlers.stream_handler import StreamHandler  # Import di dalam method
         
         stream_handler = StreamHandler(self.console)
         
         try:
-            stream = self.client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=2000,
-                stream=True
-            )
+            # iter_text melanjutkan stream yang putus di tengah jalan
+            if stream is None:
+                stream = self.iter_text(messages, model)
             
             return stream_handler.handle_openai_stream(stream, use_markdown)
             
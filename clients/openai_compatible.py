@@ -0,0 +1,85 @@
+# clients/openai_compatible.py
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI as OpenAIClient
+from rich.console import Console
+from .base_client import BaseAIClient, KEEPALIVE_EXPIRY, http_limits
+from .openai_client import OpenAIClientWrapper
+
+# Batas waktu discovery /v1/models saat startup (server lokal biasanya instan)
+DISCOVERY_TIMEOUT = 10.0
+
+class OpenAICompatibleClient(OpenAIClientWrapper):
+    """Provider untuk server kompatibel OpenAI (vLLM, llama.cpp, Ollama, ...)
+
+    Setiap instance bernama punya base_url dan connection pool sendiri,
+    sehingga server lokal yang cepat tidak berbagi koneksi dengan
+    api.openai.com. Model diambil dari /v1/models.
+    """
+
+    def __init__(self, name: str, base_url: str, api_key: str, console: Console,
+                 models=(), max_connections: int = 16, tier: str = "",
+                 keepalive_expiry: float = KEEPALIVE_EXPIRY):
+        # OpenAIClientWrapper.__init__ dilewati: client dibuat dengan base_url dan pool sendiri
+        BaseAIClient.__init__(self, console)
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.limits = http_limits(keepalive_expiry, max_connections, max_connections)
+        self.client = OpenAIClient(
+            api_key=api_key,
+            base_url=self.base_url,
+            http_client=DefaultHttpxClient(limits=self.limits)
+        )
+        # Tier kualitas semua model instance ini untuk provider 'auto'
+        self.quality_tier = tier
+        self.configured_models = list(models)
+        self.available_models = self.get_available_models()
+
+    def get_available_models(self) -> dict:
+        """Model dari konfigurasi (tanpa network)
+        
+        Jika kosong, model ditemukan oleh ModelCatalog dari /v1/models di
+        background, atau saat request pertama (ClientManager.default_model).
+        """
+        return {
+            str(i+1): {"name": name, "description": self.name}
+            for i, name in enumerate(self.configured_models)
+        }
+
+    def _discovery(self):
+        """Client untuk /v1/models: timeout pendek tanpa retry SDK"""
+        return self.client.with_options(max_retries=0, timeout=DISCOVERY_TIMEOUT)
+
+    def fetch_models(self) -> list:
+        """Semua model dari /v1/models (server lokal biasanya hanya melayani chat model)"""
+        return sorted(
+            ({"name": model.id, "description": model.owned_by or self.name} for model in self._discovery().models.list()),
+            key=lambda m: m["name"]
+        )
+
+    def validate_connection(self) -> bool:
+        try:
+            self._discovery().models.list()
+            return True
+        except Exception:
+            return False
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Async client (per event loop) dengan base_url dan connection pool instance ini"""
+        return self._loop_client(lambda: AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=DefaultAsyncHttpxClient(limits=self.limits)
+        ))
+
+    def stream_response(self, messages, model: str, use_markdown: bool = True, stream=None):
+        """Stream response dengan rendering console"""
+        from handlers.stream_handler import StreamHandler  # Import di dalam method
+
+        try:
+            return StreamHandler(self.console).handle_stream(
+                stream if stream is not None else self.iter_text(messages, model), use_markdown, "yellow"
+            )
+        except Exception as e:
+            self.console.print(f"❌ [red]{self.name} Error: {e}[/red]")
+            return None
@@ -0,0 +1,108 @@
+# clients/retry.py
+import random
+from dataclasses import dataclass
+import httpx
+import openai
+from models.chat_models import Usage
+from .deadline import DeadlineExceeded
+
+# Instruksi ke model saat melanjutkan jawaban yang terputus
+CONTINUE_PROMPT = (
+    "Your previous answer was cut off. Continue it exactly where it stopped. "
+    "Do not repeat any text that was already written and do not add a preamble."
+)
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# Error transport (koneksi putus, timeout socket); error lain dianggap bug atau request invalid
+TRANSPORT_ERRORS = (openai.APIConnectionError, httpx.TransportError, ConnectionError, TimeoutError)
+
+@dataclass
+class RetryPolicy:
+    """Retry untuk stream yang gagal (termasuk putus di tengah jalan)"""
+    max_retries: int = 3
+    backoff: float = 0.5
+    backoff_max: float = 8.0
+
+    @classmethod
+    def from_settings(cls, settings) -> "RetryPolicy":
+        return cls(
+            max_retries=settings.stream_max_retries,
+            backoff=settings.stream_retry_backoff,
+            backoff_max=settings.stream_retry_backoff_max
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Exponential backoff dengan full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** (attempt - 1))))
+
+def is_retryable(error: Exception) -> bool:
+    """Hanya error transport dan status sementara (RETRYABLE_STATUS) yang di-retry"""
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, TRANSPORT_ERRORS):
+        return True
+    # openai.APIStatusError (status_code), google.genai.errors.APIError (code)
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return isinstance(status, int) and status in RETRYABLE_STATUS
+
+class ResumeState:
+    """State satu response yang bisa dilanjutkan setelah stream putus
+    
+    Menyimpan text yang sudah diterima, dan membuang bagian awal
+    continuation yang mengulang ekor text sebelumnya.
+    """
+
+    OVERLAP_WINDOW = 200
+    MIN_OVERLAP = 8
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.parts = []
+        self.attempt = 0
+        self._pending = ""
+        self._resuming = False
+        self.usage = None
+
+    def add_usage(self, usage: Usage):
+        """Gabungkan usage dari setiap percobaan yang selesai"""
+        if self.usage is None:
+            self.usage = Usage()
+        self.usage.add(usage)
+
+    @property
+    def received(self) -> str:
+        return "".join(self.parts)
+
+    def feed(self, text: str) -> str:
+        """Terima text delta; return bagian yang boleh diteruskan ke layar"""
+        if not self._resuming:
+            self.parts.append(text)
+            return text
+        self._pending += text
+        if len(self._pending) < self.OVERLAP_WINDOW:
+            return ""
+        return self.flush()
+
+    def flush(self) -> str:
+        """Keluarkan text continuation yang masih ditahan untuk cek overlap"""
+        if not self._pending:
+            return ""
+        pending = self._pending
+        self._pending = ""
+        self._resuming = False
+        tail = self.received[-self.OVERLAP_WINDOW:]
+        for size in range(min(len(tail), len(pending)), self.MIN_OVERLAP - 1, -1):
+            if tail.endswith(pending[:size]):
+                pending = pending[size:]
+                break
+        self.parts.append(pending)
+        return pending
+
+    def next_delay(self, error: Exception) -> float:
+        """Delay sebelum retry berikutnya; lempar ulang error jika tidak bisa retry"""
+        if self.attempt >= self.policy.max_retries or not is_retryable(error):
+            raise error
+        self.attempt += 1
+        self._resuming = bool(self.parts)
+        return self.policy.delay(self.attempt)
@@ -0,0 +1,164 @@
+# clients/router.py
+import threading
+import time
+
+AUTO_PROVIDER = "auto"
+
+# Tingkat kualitas model bawaan: 1 = fast, 2 = balanced, 3 = best
+QUALITY_TIERS = {"fast": 1, "balanced": 2, "best": 3}
+MODEL_TIERS = {
+    "gemini-2.0-flash-lite": 1,
+    "gemini-2.0-flash": 1,
+    "gpt-4o-mini": 1,
+    "gpt-4.1-mini": 2,
+    "gemini-2.5-flash": 2,
+    "gpt-4o": 2,
+    "gpt-4.1": 3,
+    "gemini-2.5-pro": 3,
+}
+
+# Bobot sampel baru di EWMA
+EWMA_ALPHA = 0.3
+# Error rate (EWMA) di atas ini dianggap tidak sehat
+UNHEALTHY_ERROR_RATE = 0.5
+# Setelah jeda ini model yang tidak sehat boleh dicoba lagi
+RECOVERY_SECONDS = 60
+# Panjang jawaban tipikal untuk memperkirakan total waktu
+TYPICAL_COMPLETION_TOKENS = 300
+PROBE_PROMPT = "Balas hanya dengan: ok"
+
+class RouteStats:
+    """EWMA latency dan error rate satu pasangan provider/model"""
+
+    def __init__(self):
+        self.ttft = None
+        self.tokens_per_sec = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.last_error = ""
+        self.last_error_at = 0.0
+
+    @staticmethod
+    def _ewma(current, value):
+        return value if current is None else current + EWMA_ALPHA * (value - current)
+
+    def observe(self, ttft: float, tokens_per_sec: float):
+        self.samples += 1
+        self.ttft = self._ewma(self.ttft, ttft)
+        if tokens_per_sec:
+            self.tokens_per_sec = self._ewma(self.tokens_per_sec, tokens_per_sec)
+        self.error_rate = self._ewma(self.error_rate, 0.0)
+
+    def observe_error(self, error: Exception):
+        self.samples += 1
+        self.error_rate = self._ewma(self.error_rate, 1.0)
+        self.last_error = str(error)[:120]
+        self.last_error_at = time.monotonic()
+
+    @property
+    def healthy(self) -> bool:
+        # Tanpa traffic error rate tidak turun, jadi setelah jeda dicoba lagi
+        return (self.error_rate < UNHEALTHY_ERROR_RATE
+                or time.monotonic() - self.last_error_at > RECOVERY_SECONDS)
+
+    @property
+    def expected_seconds(self) -> float:
+        """Perkiraan waktu jawaban tipikal; 0 jika belum pernah diukur"""
+        if self.ttft is None:
+            return 0.0
+        return self.ttft + TYPICAL_COMPLETION_TOKENS / (self.tokens_per_sec or 1.0)
+
+class LatencyRouter:
+    """Pilih provider/model tercepat yang sehat untuk mode 'auto'
+
+    Statistik diisi dari traffic nyata (ClientManager mengukur setiap
+    stream upstream) dan, jika diaktifkan, dari probe kecil berkala.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._probe_thread = None
+
+    def candidates(self, client_manager, tier: str = None) -> list:
+        """Pasangan (provider, model) yang memenuhi tier kualitas"""
+        if self.settings.route_candidates:
+            pairs = []
+            for spec in self.settings.route_candidates.split(","):
+                provider, _, model = spec.strip().partition(":")
+                if model and client_manager.get_client(provider):
+                    pairs.append((provider, model))
+            return pairs
+
+        tier = tier or self.settings.route_tier
+        minimum = QUALITY_TIERS.get(tier, QUALITY_TIERS["balanced"])
+        pairs = []
+        for provider, client in client_manager.clients.items():
+            # Tier per instance (provider kompatibel OpenAI) berlaku untuk semua modelnya
+            client_tier = QUALITY_TIERS.get(getattr(client, "quality_tier", ""), 0)
+            for info in client_manager.get_models(provider).values():
+                if (MODEL_TIERS.get(info["name"]) or client_tier) >= minimum:
+                    pairs.append((provider, info["name"]))
+        return pairs
+
+    def _get(self, provider: str, model: str) -> RouteStats:
+        key = (provider, model)
+        if key not in self.stats:
+            self.stats[key] = RouteStats()
+        return self.stats[key]
+
+    def observe(self, provider: str, model: str, ttft: float, tokens_per_sec: float):
+        with self._lock:
+            self._get(provider, model).observe(ttft, tokens_per_sec)
+
+    def observe_error(self, provider: str, model: str, error: Exception):
+        with self._lock:
+            self._get(provider, model).observe_error(error)
+
+    def observe_stream(self, provider: str, model: str, stats):
+        """Catat StreamStats stream yang selesai; tanpa token pertama dihitung gagal"""
+        if stats.first_token_at is None:
+            self.observe_error(provider, model, RuntimeError("Response kosong"))
+        else:
+            self.observe(provider, model, stats.ttft, stats.tokens_per_sec)
+
+    def choose(self, client_manager, tier: str = None):
+        """(provider, model) tercepat yang sehat; yang belum diukur dicoba dulu"""
+        candidates = self.candidates(client_manager, tier)
+        if not candidates:
+            raise ValueError(f"Tidak ada model untuk tier '{tier or self.settings.route_tier}'")
+        with self._lock:
+            ranked = [(self._get(*pair), pair) for pair in candidates]
+            healthy = [(stats, pair) for stats, pair in ranked if stats.healthy]
+            # Semua sedang error: pilih yang error rate-nya paling rendah
+            pool = healthy or sorted(ranked, key=lambda item: item[0].error_rate)[:1]
+            return min(pool, key=lambda item: item[0].expected_seconds)[1]
+
+    def scores(self, client_manager, tier: str = None) -> list:
+        """Snapshot skor semua kandidat (untuk menu provider)"""
+        candidates = self.candidates(client_manager, tier)
+        with self._lock:
+            return [(pair, self._get(*pair)) for pair in candidates]
+
+    def start_probes(self, client_manager):
+        """Probe kecil berkala ke setiap kandidat (TERAI_ROUTE_PROBE_INTERVAL)"""
+        interval = self.settings.route_probe_interval
+        if interval <= 0 or self._probe_thread:
+            return None
+
+        def probe_loop():
+            while True:
+                for provider, model in self.candidates(client_manager):
+                    messages = [PROBE_PROMPT] if provider == "gemini" else [{"role": "user", "content": PROBE_PROMPT}]
+                    try:
+                        # Lewat ClientManager supaya latency dan usage ikut tercatat
+                        for _ in client_manager.iter_text(provider, messages, model, session="probe"):
+                            pass
+                    except Exception:
+                        pass
+                time.sleep(interval)
+
+        self._probe_thread = threading.Thread(target=probe_loop, name="terai-route-probe", daemon=True)
+        self._probe_thread.start()
+        return self._probe_thread
@@ -0,0 +1,163 @@
+# clients/single_flight.py
+import asyncio
+import hashlib
+import json
+import threading
+from utils.telemetry import telemetry
+
+def request_key(provider: str, model: str, messages) -> str:
+    """Key request identik: provider, model dan messages yang sama"""
+    payload = json.dumps([provider, model, messages], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _count(leader: bool):
+    telemetry.increment("requests")
+    telemetry.increment("upstream_streams" if leader else "coalesced_requests")
+
+class _Flight:
+    """Satu stream upstream dengan buffer chunk bersama"""
+
+    def __init__(self, condition):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.condition = condition
+
+class SingleFlight:
+    """Gabungkan request identik yang overlap menjadi satu stream upstream
+    
+    Stream upstream dibaca oleh thread producer ke buffer bersama; setiap
+    subscriber membaca buffer dengan cursor sendiri, jadi subscriber yang
+    datang belakangan tetap mendapat response lengkap dari awal.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def stream(self, key: str, factory):
+        """Yield chunk untuk request `key`; `factory()` membuat stream upstream"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(threading.Condition())
+            with flight.condition:
+                flight.subscribers += 1
+        _count(leader)
+
+        if leader:
+            threading.Thread(
+                target=self._produce,
+                args=(key, flight, factory),
+                name="terai-single-flight",
+                daemon=True
+            ).start()
+        return self._subscribe(key, flight)
+
+    def _produce(self, key: str, flight: _Flight, factory):
+        try:
+            for chunk in factory():
+                with flight.condition:
+                    if flight.subscribers == 0:
+                        break
+                    flight.chunks.append(chunk)
+                    flight.condition.notify_all()
+        except Exception as e:
+            flight.error = e
+        finally:
+            self._forget(key, flight)
+            with flight.condition:
+                flight.done = True
+                flight.condition.notify_all()
+
+    def _forget(self, key: str, flight: _Flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _subscribe(self, key: str, flight: _Flight):
+        cursor = 0
+        try:
+            while True:
+                with flight.condition:
+                    while cursor >= len(flight.chunks) and not flight.done:
+                        flight.condition.wait()
+                    new_chunks = flight.chunks[cursor:]
+                    finished = flight.done
+                cursor += len(new_chunks)
+                yield from new_chunks
+                if finished and cursor >= len(flight.chunks):
+                    if flight.error:
+                        raise flight.error
+                    return
+        finally:
+            with flight.condition:
+                flight.subscribers -= 1
+                abandoned = flight.subscribers == 0 and not flight.done
+            if abandoned:
+                # Semua subscriber pergi: request baru jangan ikut flight ini
+                self._forget(key, flight)
+
+class AsyncSingleFlight:
+    """Versi asyncio dari SingleFlight (producer berupa task)"""
+
+    def __init__(self):
+        self._flights = {}
+        # Referensi task producer supaya tidak di-garbage-collect di tengah jalan
+        self._tasks = set()
+
+    def stream(self, key: str, factory):
+        """Async-yield chunk untuk request `key`; `factory()` membuat async stream upstream"""
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = self._flights[key] = _Flight(asyncio.Condition())
+        flight.subscribers += 1
+        _count(leader)
+
+        if leader:
+            task = asyncio.get_running_loop().create_task(self._produce(key, flight, factory))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return self._subscribe(key, flight)
+
+    async def _produce(self, key: str, flight: _Flight, factory):
+        try:
+            async for chunk in factory():
+                if flight.subscribers == 0:
+                    break
+                flight.chunks.append(chunk)
+                async with flight.condition:
+                    flight.condition.notify_all()
+        except Exception as e:
+            flight.error = e
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.done = True
+            async with flight.condition:
+                flight.condition.notify_all()
+
+    async def _subscribe(self, key: str, flight: _Flight):
+        cursor = 0
+        try:
+            while True:
+                if cursor >= len(flight.chunks) and not flight.done:
+                    async with flight.condition:
+                        await flight.condition.wait_for(
+                            lambda: cursor < len(flight.chunks) or flight.done
+                        )
+                new_chunks = flight.chunks[cursor:]
+                cursor += len(new_chunks)
+                for chunk in new_chunks:
+                    yield chunk
+                if flight.done and cursor >= len(flight.chunks):
+                    if flight.error:
+                        raise flight.error
+                    return
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done and self._flights.get(key) is flight:
+                del self._flights[key]
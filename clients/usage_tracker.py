@@ -0,0 +1,125 @@
+# clients/usage_tracker.py
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from models.chat_models import Usage
+
+GROUP_COLUMNS = ("session", "provider", "model", "day")
+
+class BudgetExceeded(Exception):
+    """Request ditolak karena akan melewati hard budget token"""
+
+def estimate_tokens(messages, max_tokens: int) -> int:
+    """Perkiraan kasar token satu request: ~4 karakter per token + max output"""
+    chars = sum(
+        len(msg.get("content") or "") if isinstance(msg, dict) else len(str(msg))
+        for msg in messages
+    )
+    return chars // 4 + max_tokens
+
+class UsageTracker:
+    """Akumulasi token usage di SQLite lokal (cache_dir/usage.db)
+
+    Setiap stream upstream dicatat sekali per sesi/provider/model/hari,
+    sehingga total bisa dibaca di 'config', diekspor, dan dipakai untuk
+    budget harian.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.path = os.path.join(settings.cache_dir, "usage.db")
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Dibuka lazy: startup tidak menyentuh disk jika usage tidak dipakai
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                "ts REAL, day TEXT, session TEXT, provider TEXT, model TEXT, "
+                "prompt_tokens INTEGER, completion_tokens INTEGER, cached_tokens INTEGER)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS usage_day ON usage (day)")
+        return self._db
+
+    def record(self, session: str, provider: str, model: str, usage: Usage):
+        """Simpan usage satu request"""
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (now, time.strftime("%Y-%m-%d", time.localtime(now)), session or "", provider, model,
+                 usage.prompt_tokens, usage.completion_tokens, usage.cached_tokens)
+            )
+            db.commit()
+
+    def totals(self, day: str = None, session: str = None) -> Usage:
+        """Total usage, opsional difilter per hari dan/atau sesi"""
+        where, params = self._where(day=day, session=session)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(completion_tokens), 0), "
+                f"COALESCE(SUM(cached_tokens), 0) FROM usage{where}",
+                params
+            ).fetchone()
+        return Usage(*row)
+
+    def today(self) -> Usage:
+        return self.totals(day=time.strftime("%Y-%m-%d"))
+
+    def aggregate(self, *group_by: str) -> list:
+        """Total per kombinasi kolom (session, provider, model, day)"""
+        group_by = [column for column in group_by if column in GROUP_COLUMNS] or list(GROUP_COLUMNS)
+        columns = ", ".join(group_by)
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {columns}, COUNT(*), SUM(prompt_tokens), SUM(completion_tokens), SUM(cached_tokens) "
+                f"FROM usage GROUP BY {columns} ORDER BY {columns}"
+            ).fetchall()
+        keys = group_by + ["requests", "prompt_tokens", "completion_tokens", "cached_tokens"]
+        return [dict(zip(keys, row)) for row in rows]
+
+    def export(self, path: str) -> int:
+        """Ekspor agregat per sesi/provider/model/hari ke .json atau .csv"""
+        rows = self.aggregate(*GROUP_COLUMNS)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if path.lower().endswith(".json"):
+                json.dump(rows, f, indent=2)
+            else:
+                writer = csv.DictWriter(f, fieldnames=list(GROUP_COLUMNS) + [
+                    "requests", "prompt_tokens", "completion_tokens", "cached_tokens"
+                ])
+                writer.writeheader()
+                writer.writerows(rows)
+        return len(rows)
+
+    def check_budget(self, estimate: int) -> str:
+        """Cek budget harian sebelum request dikirim
+
+        Raise BudgetExceeded jika hard budget akan terlewati; return pesan
+        peringatan jika soft budget terlewati, selain itu string kosong.
+        """
+        soft = self.settings.budget_soft_tokens
+        hard = self.settings.budget_hard_tokens
+        if not soft and not hard:
+            return ""
+        used = self.today().total_tokens
+        if hard and used + estimate > hard:
+            raise BudgetExceeded(
+                f"Budget token harian habis: {used:,} terpakai, request ini ~{estimate:,}, batas {hard:,}"
+            )
+        if soft and used + estimate > soft:
+            return f"Budget token harian hampir habis: {used:,} dari soft limit {soft:,} terpakai"
+        return ""
+
+    def _where(self, **filters):
+        filters = {key: value for key, value in filters.items() if value is not None}
+        if not filters:
+            return "", ()
+        return " WHERE " + " AND ".join(f"{key} = ?" for key in filters), tuple(filters.values())
@@ -11,21 +11,107 @@ class Settings:
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         
+        # Provider kompatibel OpenAI (vLLM, llama.cpp, ...): lihat _load_compat_providers
+        self.compat_providers = self._load_compat_providers()
+        
         # Default models
         self.default_gemini_model = "gemini-2.0-flash"
         self.default_openai_model = "gpt-4o"
         
         # Chat settings
         self.max_history_length = 20  # 10 exchanges
-        self.temperature = 0.7
-        self.max_tokens = 2000
+        self.temperature = float(os.getenv("TERAI_TEMPERATURE") or 0.7)
+        self.max_tokens = int(os.getenv("TERAI_MAX_TOKENS") or 2000)
+        
+        # Deadline per request dalam detik (0 = tanpa batas); override per model
+        # lewat TERAI_MODEL_DEADLINES="gemini-2.5-pro:first_token=120,total=600;..."
+        self.connect_timeout = float(os.getenv("TERAI_CONNECT_TIMEOUT") or 10)
+        self.first_token_timeout = float(os.getenv("TERAI_FIRST_TOKEN_TIMEOUT") or 60)
+        self.stall_timeout = float(os.getenv("TERAI_STALL_TIMEOUT") or 30)
+        self.total_timeout = float(os.getenv("TERAI_TOTAL_TIMEOUT") or 300)
+        self.model_deadlines = os.getenv("TERAI_MODEL_DEADLINES") or ""
+        
+        # Retry stream yang putus (dilanjutkan dari partial output)
+        self.stream_max_retries = int(os.getenv("TERAI_STREAM_MAX_RETRIES") or 3)
+        self.stream_retry_backoff = float(os.getenv("TERAI_STREAM_RETRY_BACKOFF") or 0.5)
+        self.stream_retry_backoff_max = float(os.getenv("TERAI_STREAM_RETRY_BACKOFF_MAX") or 8.0)
+        
+        # Record/replay cassette (provider offline untuk profiling & regression test)
+        self.record_dir = os.getenv("TERAI_RECORD_DIR") or ""
+        self.replay_dir = os.getenv("TERAI_REPLAY_DIR") or ""
+        self.replay_speed = os.getenv("TERAI_REPLAY_SPEED") or "original"
+        
+        # Lampiran /attach: ukuran chunk dan batas token konteks per pertanyaan
+        self.attach_chunk_tokens = int(os.getenv("TERAI_ATTACH_CHUNK_TOKENS") or 500)
+        self.attach_context_tokens = int(os.getenv("TERAI_ATTACH_CONTEXT_TOKENS") or 3000)
+        
+        # /mapreduce: model cepat ("provider/model" atau "auto/<tier>"), ukuran chunk,
+        # batas input satu request reduce, jumlah worker dan retry per chunk
+        self.mapreduce_model = os.getenv("TERAI_MAPREDUCE_MODEL") or "auto/fast"
+        self.mapreduce_chunk_tokens = int(os.getenv("TERAI_MAPREDUCE_CHUNK_TOKENS") or 3000)
+        self.mapreduce_reduce_tokens = int(os.getenv("TERAI_MAPREDUCE_REDUCE_TOKENS") or 8000)
+        self.mapreduce_workers = int(os.getenv("TERAI_MAPREDUCE_WORKERS") or 4)
+        self.mapreduce_retries = int(os.getenv("TERAI_MAPREDUCE_RETRIES") or 2)
+        
+        # Budget token harian (0 = tanpa batas); soft = peringatan, hard = request ditolak
+        self.budget_soft_tokens = int(os.getenv("TERAI_BUDGET_SOFT_TOKENS") or 0)
+        self.budget_hard_tokens = int(os.getenv("TERAI_BUDGET_HARD_TOKENS") or 0)
+        
+        # Provider 'auto': tier kualitas minimum (fast/balanced/best), kandidat
+        # eksplisit 'provider:model,...' (opsional) dan interval probe (0 = mati)
+        self.route_tier = os.getenv("TERAI_ROUTE_TIER") or "balanced"
+        self.route_candidates = os.getenv("TERAI_ROUTE_CANDIDATES") or ""
+        self.route_probe_interval = float(os.getenv("TERAI_ROUTE_PROBE_INTERVAL") or 0)
+        
+        # Cache settings
+        self.cache_dir = os.getenv("TERAI_CACHE_DIR") or os.path.join(
+            os.path.expanduser("~"), ".cache", "terai"
+        )
+        self.model_cache_ttl = int(os.getenv("TERAI_MODEL_CACHE_TTL") or 24 * 60 * 60)
+        
+        # Daemon settings (lihat juga terai_client.default_socket_path)
+        self.socket_path = os.getenv("TERAI_SOCKET") or os.path.join(
+            os.getenv("XDG_RUNTIME_DIR") or self.cache_dir, "terai.sock"
+        )
+        
+        # Koneksi HTTP ke provider: idle keep-alive di pool (detik) dan interval
+        # request keep-warm daemon supaya TLS tidak di-handshake ulang (0 = mati)
+        self.keepalive_expiry = float(os.getenv("TERAI_KEEPALIVE_EXPIRY") or 300)
+        self.keep_warm_interval = float(os.getenv("TERAI_KEEP_WARM_INTERVAL") or 60)
+        
+        # Gateway settings (server kompatibel OpenAI)
+        self.gateway_host = os.getenv("TERAI_GATEWAY_HOST") or "127.0.0.1"
+        self.gateway_port = int(os.getenv("TERAI_GATEWAY_PORT") or 8765)
+        self.gateway_token = os.getenv("TERAI_GATEWAY_TOKEN") or ""
+        self.gateway_client_concurrency = int(os.getenv("TERAI_GATEWAY_CLIENT_CONCURRENCY") or 64)
+        self.gateway_max_queue = int(os.getenv("TERAI_GATEWAY_MAX_QUEUE") or 256)
         
         # UI settings
         self.default_markdown = True
         self.refresh_rate = 10  # for live display
 
+    def _load_compat_providers(self) -> dict:
+        """Instance bernama dari TERAI_COMPAT_PROVIDERS="local,vllm"
+        
+        Per nama: TERAI_COMPAT_<NAMA>_BASE_URL (wajib), _API_KEY, _MODELS
+        (daftar model; kosong = discovery dari /v1/models), _MAX_CONNECTIONS
+        dan _TIER (tier kualitas untuk provider 'auto').
+        """
+        providers = {}
+        names = (os.getenv("TERAI_COMPAT_PROVIDERS") or "").split(",")
+        for name in filter(None, (name.strip().lower() for name in names)):
+            prefix = f"TERAI_COMPAT_{name.upper().replace('-', '_')}_"
+            providers[name] = {
+                "base_url": os.getenv(prefix + "BASE_URL") or "",
+                "api_key": os.getenv(prefix + "API_KEY") or "none",
+                "models": [model.strip() for model in (os.getenv(prefix + "MODELS") or "").split(",") if model.strip()],
+                "max_connections": int(os.getenv(prefix + "MAX_CONNECTIONS") or 16),
+                "tier": os.getenv(prefix + "TIER") or ""
+            }
+        return providers
+
     def validate_api_keys(self):
         """Validate that at least one API key is present"""
-        if not self.gemini_api_key and not self.openai_api_key:
-            raise ValueError("No API keys found! Please set GEMINI_API_KEY or OPENAI_API_KEY")
+        if not self.gemini_api_key and not self.openai_api_key and not self.replay_dir and not self.compat_providers:
+            raise ValueError("No API keys found! Please set GEMINI_API_KEY or OPENAI_API_KEY (atau TERAI_REPLAY_DIR / TERAI_COMPAT_PROVIDERS)")
         return True
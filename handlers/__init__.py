@@ -3,11 +3,14 @@ from .command_handler import CommandHandler
 from .provider_manager import ProviderManager
 from .ui_launcher import UILauncher
 from .session_manager import SessionManager
+from .chat_session import ChatSession, CompareSession
 
 __all__ = [
     'ChatHandler',
     'CommandHandler',
     'ProviderManager',
     'UILauncher',
-    'SessionManager'
+    'SessionManager',
+    'ChatSession',
+    'CompareSession'
 ]
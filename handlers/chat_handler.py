@@ -3,12 +3,14 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 from models.chat_models import ChatHistory
+from utils.profiling import timed
 
 # Import modular components
 from .command_handler import CommandHandler
 from .provider_manager import ProviderManager
 from .ui_launcher import UILauncher
 from .session_manager import SessionManager
+from .chat_session import ChatSession, CompareSession
 
 class ChatHandler:
     """Main coordinator untuk chat interactions"""
@@ -45,6 +47,21 @@ Ketik 'help' untuk melihat informasi
         """Start chat session dengan modern UI"""
         return self.ui_launcher.launch_chat_ui(self)
     
+    def create_session(self, inherit_history: bool = False) -> ChatSession:
+        """Buat sesi chat baru dengan provider/model aktif saat ini"""
+        return ChatSession(
+            self.client_manager,
+            self.settings,
+            self.provider_manager.current_provider,
+            self.provider_manager.current_model,
+            session_manager=self.session_manager if inherit_history else None
+        )
+    
+    def create_compare_session(self, specs):
+        """Buat CompareSession dari daftar 'provider:model'; return (session, errors)"""
+        sessions, errors = CompareSession.parse_pairs(self.create_session, specs)
+        return CompareSession(sessions), errors
+    
     def _get_ai_response(self, user_input: str) -> str:
         """Get AI response (untuk Textual UI)"""
         return self.session_manager.get_ai_response(
@@ -54,9 +71,11 @@ Ketik 'help' untuk melihat informasi
             user_input
         )
     
+    @timed("chat_handler.process_user_input")
     def process_user_input(self, user_input: str):
         """Process user input in main menu"""
-        user_input = user_input.strip().lower()
+        raw_input = user_input.strip()
+        user_input = raw_input.lower()
         
         if user_input == 'quit':
             self.console.print("\n👋 [bold yellow]Terima kasih telah menggunakan Terai![/bold yellow]")
@@ -84,6 +103,15 @@ Ketik 'help' untuk melihat informasi
             )
             return True
             
+        elif user_input == 'usage':
+            self.command_handler.show_usage()
+            return True
+            
+        elif user_input.startswith('usage export'):
+            # Path diambil dari input asli supaya huruf besar/kecil tetap
+            self.command_handler.export_usage(raw_input[len('usage export'):].strip())
+            return True
+            
         elif user_input == 'help':
             self.command_handler.show_help()
             return True
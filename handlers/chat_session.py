@@ -0,0 +1,140 @@
+from .session_manager import SessionManager
+from clients.router import AUTO_PROVIDER, QUALITY_TIERS
+
+class ChatSession:
+    """Satu sesi chat (tab) dengan history, provider dan model sendiri
+    
+    Semua sesi berbagi satu `ClientManager`, sehingga SDK client dan
+    connection pool hanya dibuat sekali.
+    """
+    
+    def __init__(self, client_manager, settings, provider: str, model: str, session_manager: SessionManager = None):
+        self.client_manager = client_manager
+        self.settings = settings
+        self.current_provider = provider
+        self.current_model = model
+        self.session_manager = session_manager or SessionManager(settings)
+    
+    def get_ai_response(self, user_input: str, on_chunk=None) -> str:
+        """Get AI response untuk sesi ini"""
+        return self.session_manager.get_ai_response(
+            self.client_manager,
+            self.current_provider,
+            self.current_model,
+            user_input,
+            on_chunk=on_chunk
+        )
+    
+    def set_provider(self, provider: str) -> bool:
+        """Ganti provider sesi ini dan reset ke model default-nya"""
+        if provider == AUTO_PROVIDER:
+            # Model 'auto' = tier kualitas; provider/model dipilih per request
+            self.current_provider = provider
+            self.current_model = self.settings.route_tier
+            return True
+        client = self.client_manager.get_client(provider)
+        if not client:
+            return False
+        self.current_provider = provider
+        self.current_model = self.client_manager.default_model(provider)
+        return True
+    
+    def set_model(self, model: str) -> bool:
+        """Ganti model sesi ini (untuk 'auto': tier kualitas)"""
+        if self.current_provider == AUTO_PROVIDER:
+            if model not in QUALITY_TIERS:
+                return False
+            self.current_model = model
+            return True
+        models = self.client_manager.get_models(self.current_provider)
+        names = [info["name"] for info in models.values()]
+        if model not in names:
+            return False
+        self.current_model = model
+        return True
+    
+    @property
+    def history(self):
+        return self.session_manager.history
+    
+    def fork(self, name: str = None) -> str:
+        """Branch history baru (O(1), prefix dibagi dengan branch asal)"""
+        return self.session_manager.fork(name)
+    
+    def switch_branch(self, name: str) -> bool:
+        return self.session_manager.switch_branch(name)
+    
+    def rewind(self):
+        """Mundur satu giliran untuk regenerate; lihat ChatHistory.rewind"""
+        return self.session_manager.rewind()
+    
+    def attach(self, path: str):
+        """Lampirkan file ke sesi ini; lihat SessionManager.attach"""
+        return self.session_manager.attach(path)
+    
+    def detach(self, attachment_id: str) -> bool:
+        return self.session_manager.detach(attachment_id)
+    
+    async def map_reduce(self, path: str, instruction: str, on_progress=None) -> str:
+        """Instruksi untuk file yang melebihi context window; lihat MapReduceJob"""
+        return await self.session_manager.map_reduce(self.client_manager, path, instruction, on_progress)
+    
+    @property
+    def attachments(self) -> dict:
+        return self.session_manager.attachments
+    
+    @property
+    def last_usage(self):
+        """Token usage response terakhir (None jika provider tidak melaporkan)"""
+        return self.session_manager.last_usage
+    
+    @property
+    def last_warning(self) -> str:
+        return self.session_manager.last_warning
+    
+    @property
+    def last_deadline(self):
+        """DeadlineExceeded yang memotong response terakhir, atau None"""
+        return self.session_manager.last_deadline
+    
+    @property
+    def last_route(self):
+        """(provider, model) yang menjawab terakhir"""
+        return self.session_manager.last_route
+
+class CompareSession:
+    """Beberapa ChatSession (pasangan provider/model) yang menerima prompt yang sama
+    
+    Setiap pasangan menyimpan history sendiri, sehingga perbandingan bisa
+    berlanjut beberapa giliran.
+    """
+    
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+    
+    @property
+    def current_provider(self) -> str:
+        return "compare"
+    
+    @property
+    def current_model(self) -> str:
+        return " vs ".join(session.current_model for session in self.sessions)
+    
+    @staticmethod
+    def parse_pairs(create_session, specs):
+        """Buat sesi dari spesifikasi 'provider:model' (atau 'provider/model')
+        
+        Return (sessions, errors).
+        """
+        sessions, errors = [], []
+        for spec in specs:
+            provider, sep, model = spec.replace("/", ":", 1).partition(":")
+            session = create_session()
+            if not session.set_provider(provider.lower()):
+                errors.append(f"Provider '{provider}' tidak tersedia")
+                continue
+            if sep and not session.set_model(model):
+                errors.append(f"Model '{model}' tidak tersedia untuk {provider}")
+                continue
+            sessions.append(session)
+        return sessions, errors
@@ -1,5 +1,7 @@
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
+from utils.telemetry import telemetry
 
 class CommandHandler:
     """Handle semua perintah di main menu"""
@@ -18,6 +20,8 @@ class CommandHandler:
   • [cyan]model[/cyan] - Mengubah model AI
   • [cyan]provider[/cyan] - Mengganti provider AI
   • [cyan]config[/cyan] - Melihat konfigurasi saat ini
+  • [cyan]usage[/cyan] - Token usage per provider/model dan hari
+  • [cyan]usage export <file.csv|file.json>[/cyan] - Ekspor token usage
   • [cyan]help[/cyan] - Menampilkan bantuan ini
   • [cyan]quit[/cyan] - Keluar dari aplikasi
 
@@ -26,8 +30,19 @@ class CommandHandler:
   • [cyan]Enter[/cyan] - Baris baru
   • [cyan]Ctrl+J[/cyan] - Kirim pesan
   • [cyan]Tombol Kirim[/cyan] - Alternatif kirim pesan
+  • [cyan]Antrian[/cyan] - Pesan yang dikirim saat AI menjawab diproses berurutan (Edit / Batal)
   • [cyan]Markdown[/cyan] - Output rapi dengan formatting
   • [cyan]Scroll Area[/cyan] - History chat bisa di-scroll
+  • [cyan]Ctrl+T / Ctrl+W[/cyan] - Buka / tutup tab sesi
+  • [cyan]/provider <nama>[/cyan] - Ganti provider untuk tab aktif
+  • [cyan]/model <nama>[/cyan] - Ganti model untuk tab aktif
+  • [cyan]/compare <provider:model> ...[/cyan] - Bandingkan beberapa model berdampingan
+  • [cyan]/fork [nama][/cyan] - Buat branch percakapan dari posisi sekarang
+  • [cyan]/branch [nama][/cyan] - Lihat daftar branch / pindah branch
+  • [cyan]/regenerate [model][/cyan] - Ulangi jawaban terakhir (opsional dengan model lain)
+  • [cyan]/attach <path>[/cyan] - Lampirkan file besar; hanya bagian relevan yang dikirim
+  • [cyan]/detach <id>[/cyan] - Lepas lampiran dari sesi
+  • [cyan]/mapreduce <file> <instruksi>[/cyan] - Kerjakan instruksi untuk seluruh file besar per chunk
 
 [bold yellow]Ketik 'startchat' untuk memulai![/bold yellow]
 """
@@ -35,6 +50,10 @@ class CommandHandler:
     
     def show_config(self, current_provider: str, current_model: str, use_markdown: bool, history_length: int):
         """Show current configuration"""
+        stats = telemetry.snapshot()
+        usage_tracker = self.chat_handler.client_manager.usage_tracker
+        today = usage_tracker.today()
+        total = usage_tracker.totals()
         config_text = f"""
 [bold cyan]⚙️ Konfigurasi Saat Ini:[/bold cyan]
 
@@ -43,11 +62,51 @@ class CommandHandler:
   • [yellow]Markdown:[/yellow] {'ON' if use_markdown else 'OFF'}
   • [yellow]History:[/yellow] {history_length} pesan
   • [yellow]UI Mode:[/yellow] Textual (Modern)
+  • [yellow]Upstream:[/yellow] {stats.get('upstream_streams', 0)} stream untuk {stats.get('requests', 0)} request ({stats.get('coalesced_requests', 0)} digabung)
+  • [yellow]Token hari ini:[/yellow] {today.total_tokens:,} (prompt {today.prompt_tokens:,}, output {today.completion_tokens:,}, cached {today.cached_tokens:,}){self._budget_text()}
+  • [yellow]Token total:[/yellow] {total.total_tokens:,}
 
 [green]Gunakan 'model' atau 'provider' untuk mengubah konfigurasi[/green]
 """
         self.console.print(Panel(config_text, title="⚙️ Configuration", border_style="green"))
     
+    def _budget_text(self) -> str:
+        settings = self.chat_handler.settings
+        limits = []
+        if settings.budget_soft_tokens:
+            limits.append(f"soft {settings.budget_soft_tokens:,}")
+        if settings.budget_hard_tokens:
+            limits.append(f"hard {settings.budget_hard_tokens:,}")
+        return f" • budget {', '.join(limits)}" if limits else ""
+    
+    def show_usage(self):
+        """Tabel token usage per hari, provider dan model"""
+        rows = self.chat_handler.client_manager.usage_tracker.aggregate("day", "provider", "model")
+        if not rows:
+            self.console.print("[yellow]Belum ada token usage yang tercatat.[/yellow]")
+            return
+        table = Table(title="📊 Token Usage", border_style="cyan")
+        for column in ("Hari", "Provider", "Model", "Request", "Prompt", "Output", "Cached"):
+            table.add_column(column, justify="right" if column not in ("Hari", "Provider", "Model") else "left")
+        for row in rows:
+            table.add_row(
+                row["day"], row["provider"], row["model"], str(row["requests"]),
+                f"{row['prompt_tokens']:,}", f"{row['completion_tokens']:,}", f"{row['cached_tokens']:,}"
+            )
+        self.console.print(table)
+    
+    def export_usage(self, path: str):
+        """Ekspor token usage ke CSV/JSON"""
+        if not path:
+            self.console.print("[red]Gunakan: usage export <file.csv|file.json>[/red]")
+            return
+        try:
+            count = self.chat_handler.client_manager.usage_tracker.export(path)
+        except OSError as e:
+            self.console.print(f"[red]Gagal ekspor usage: {e}[/red]")
+            return
+        self.console.print(f"✅ [green]{count} baris usage diekspor ke {path}[/green]")
+    
     def show_unknown_command(self):
         """Show unknown command message"""
         self.console.print("[red]Perintah tidak dikenali. Ketik 'help' untuk bantuan.[/red]")
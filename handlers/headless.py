@@ -0,0 +1,109 @@
+import json
+import sys
+from clients.usage_tracker import BudgetExceeded
+from clients.router import AUTO_PROVIDER
+from clients.deadline import DeadlineExceeded
+from models.chat_models import Usage
+from utils.stream_stats import StreamStats
+
+# Sama dengan timeout(1)
+DEADLINE_EXIT_CODE = 124
+
+class HeadlessRunner:
+    """Mode pipe: satu prompt, text delta mentah langsung ke stdout
+
+    Tanpa Rich, Live maupun Markdown; cocok untuk shell pipeline dan CI.
+    Dengan `json_mode` setiap event ditulis sebagai satu baris NDJSON:
+    delta, usage, timings, lalu done (atau error). Deadline yang terlewati
+    dilaporkan sebagai error dengan field `deadline` dan exit code 124.
+    """
+
+    def __init__(self, client_manager, settings, out=None):
+        self.client_manager = client_manager
+        self.settings = settings
+        self.out = out or sys.stdout
+
+    def resolve(self, provider: str = None, model: str = None):
+        """Provider/model dari argumen; 'provider/model' juga diterima
+        
+        Tanpa provider, provider ditebak dari model; provider 'auto' memakai
+        router latency, dengan `model` sebagai tier.
+        """
+        if not provider and model:
+            provider = self.client_manager.provider_for_model(model)
+            if not provider and "/" in model:
+                provider, model = model.split("/", 1)
+        if provider == AUTO_PROVIDER:
+            return self.client_manager.route(model)
+        provider = provider or list(self.client_manager.clients.keys())[0]
+        if not self.client_manager.get_client(provider):
+            raise ValueError(f"Provider '{provider}' tidak tersedia")
+        if not model:
+            model = self.client_manager.default_model(provider, discover=True)
+        return provider, model
+
+    def run(self, prompt: str, provider: str = None, model: str = None, json_mode: bool = False) -> int:
+        """Stream satu jawaban; return exit code"""
+        emit = self._emit_json if json_mode else None
+        try:
+            provider, model = self.resolve(provider, model)
+            if provider == "gemini":
+                messages = [prompt]
+            else:
+                messages = [{"role": "user", "content": prompt}]
+            self.client_manager.check_budget(messages)
+
+            stats = StreamStats()
+            write = self.out.write
+            flush = self.out.flush
+            for item in self.client_manager.iter_text(provider, messages, model, session="headless"):
+                if isinstance(item, Usage):
+                    stats.usage = item
+                    continue
+                stats.on_chunk(item)
+                if emit:
+                    emit({"type": "delta", "text": item})
+                else:
+                    write(item)
+                    flush()
+            stats.finish()
+        except DeadlineExceeded as e:
+            if emit:
+                emit({"type": "error", "message": str(e), "deadline": e.phase})
+            else:
+                write("\n")
+                flush()
+                sys.stderr.write(f"terai: {e}\n")
+            return DEADLINE_EXIT_CODE
+        except (BudgetExceeded, ValueError) as e:
+            return self._fail(emit, str(e))
+        except Exception as e:
+            return self._fail(emit, f"{type(e).__name__}: {e}")
+
+        if not emit:
+            write("\n")
+            flush()
+            return 0
+        if stats.usage:
+            emit({"type": "usage", **vars(stats.usage)})
+        emit({
+            "type": "timings",
+            "ttft": round(stats.ttft, 4),
+            "total": round(stats.ended - stats.started, 4),
+            "tokens_per_sec": round(stats.tokens_per_sec, 1),
+            "completion_tokens": stats.completion_tokens,
+            "estimated": stats.usage_is_estimate
+        })
+        emit({"type": "done", "provider": provider, "model": model})
+        return 0
+
+    def _emit_json(self, event: dict):
+        self.out.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    def _fail(self, emit, message: str) -> int:
+        if emit:
+            emit({"type": "error", "message": message})
+        else:
+            sys.stderr.write(f"terai: {message}\n")
+        return 1
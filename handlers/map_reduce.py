@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import threading
+from clients.deadline import DeadlineExceeded
+from clients.retry import RetryPolicy, is_retryable
+from clients.router import AUTO_PROVIDER
+from clients.usage_tracker import BudgetExceeded
+from models.chat_models import Usage
+from utils.attachments import CHARS_PER_TOKEN, attachment_id, iter_spans
+
+MAP_PROMPT = (
+    "Instruksi: {instruction}\n\n"
+    "Berikut bagian {index} dari {total} file {name}. Kerjakan instruksi hanya "
+    "untuk bagian ini; hasilnya nanti digabung dengan hasil bagian lain, jadi "
+    "tulis temuan yang relevan saja tanpa pembuka.\n\n```\n{text}\n```"
+)
+REDUCE_PROMPT = (
+    "Instruksi: {instruction}\n\n"
+    "Berikut hasil parsial dari beberapa bagian file {name}. Gabungkan menjadi "
+    "satu jawaban yang utuh untuk instruksi di atas: hilangkan duplikasi dan "
+    "pertahankan detail penting.\n\n{parts}"
+)
+
+class EmptyResponse(RuntimeError):
+    """Model mengembalikan response kosong (di-retry)"""
+
+def provider_messages(provider: str, prompt: str) -> list:
+    """Satu prompt user dalam format provider (lihat ChatHistory)"""
+    if provider == "gemini":
+        return [prompt]
+    return [{"role": "user", "content": prompt}]
+
+class MapReduceCache:
+    """Hasil map (level 0) dan reduce (level 1+) per job di SQLite
+
+    Setiap hasil langsung di-commit, sehingga job yang terputus bisa
+    dilanjutkan tanpa mengulang chunk yang sudah selesai.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (level INTEGER, idx INTEGER, text TEXT, PRIMARY KEY (level, idx))"
+        )
+        self._lock = threading.Lock()
+
+    def load(self, level: int) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT idx, text FROM results WHERE level = ?", (level,)).fetchall()
+        return dict(rows)
+
+    def put(self, level: int, idx: int, text: str):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (level, idx, text))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class MapReduceJob:
+    """/mapreduce: jalankan instruksi per chunk file, lalu gabungkan hasilnya
+
+    Chunk dibaca lazy lewat mmap dan dikirim ke model cepat
+    (TERAI_MAPREDUCE_MODEL) oleh worker pool berukuran tetap. Hasil parsial
+    digabung bertingkat sampai muat dalam satu request reduce. Job
+    diidentifikasi dari file, instruksi, model dan ukuran chunk.
+    """
+
+    def __init__(self, client_manager, settings, path: str, instruction: str, session: str = ""):
+        self.client_manager = client_manager
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.name = os.path.basename(self.path)
+        self.instruction = instruction
+        self.session = session
+        self.provider, _, self.model = settings.mapreduce_model.partition("/")
+        self.chunk_bytes = max(settings.mapreduce_chunk_tokens, 1) * CHARS_PER_TOKEN
+        self.reduce_chars = max(settings.mapreduce_reduce_tokens, 1) * CHARS_PER_TOKEN
+        self.workers = max(settings.mapreduce_workers, 1)
+        self.retry_policy = RetryPolicy(
+            max_retries=settings.mapreduce_retries,
+            backoff=settings.stream_retry_backoff,
+            backoff_max=settings.stream_retry_backoff_max
+        )
+        # Retry/resume level client dimatikan: semua percobaan dihitung oleh _complete
+        self.client_retry_policy = RetryPolicy(max_retries=0)
+        key = json.dumps([attachment_id(self.path), instruction, settings.mapreduce_model, self.chunk_bytes])
+        self.id = hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+        self.cache_path = os.path.join(settings.cache_dir, "mapreduce", f"{self.id}.db")
+        self.retries = 0
+
+    def _resolve(self):
+        if self.provider == AUTO_PROVIDER:
+            return self.client_manager.route(self.model or None)
+        if not self.client_manager.get_client(self.provider):
+            raise ValueError(f"Provider '{self.provider}' tidak tersedia")
+        return self.provider, self.model
+
+    async def _complete(self, prompt: str) -> str:
+        """Satu request ke model cepat, di-retry jika gagal sementara, timeout atau kosong
+        
+        Maksimal mapreduce_retries + 1 request upstream per chunk.
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            provider, model = self._resolve()
+            messages = provider_messages(provider, prompt)
+            # Budget dicek di SQLite: jangan tahan event loop
+            await loop.run_in_executor(None, self.client_manager.check_budget, messages)
+            try:
+                parts = []
+                async for item in self.client_manager.aiter_text(
+                    provider, messages, model, session=self.session, retry_policy=self.client_retry_policy
+                ):
+                    if not isinstance(item, Usage):
+                        parts.append(item)
+                text = "".join(parts).strip()
+                if not text:
+                    raise EmptyResponse("Response kosong")
+                return text
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                attempt += 1
+                if attempt > self.retry_policy.max_retries:
+                    raise
+                if not (isinstance(e, (DeadlineExceeded, EmptyResponse)) or is_retryable(e)):
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+
+    async def _run_pool(self, jobs, total: int, done: dict, level: int, report):
+        """Jalankan (idx, prompt) dengan maksimal `workers` request bersamaan"""
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(maxsize=self.workers * 2)
+
+        async def produce():
+            for idx, make_prompt in jobs:
+                if idx not in done:
+                    # Prompt (dan isi chunk) baru dibaca saat ada slot antrean
+                    await pending.put((idx, make_prompt()))
+            for _ in range(self.workers):
+                await pending.put(None)
+
+        async def work():
+            while True:
+                item = await pending.get()
+                if item is None:
+                    return
+                idx, prompt = item
+                text = await self._complete(prompt)
+                done[idx] = text
+                await loop.run_in_executor(None, self.cache.put, level, idx, text)
+                report(level, len(done), total)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(produce())
+                for _ in range(self.workers):
+                    group.create_task(work())
+        except BaseExceptionGroup as e:
+            raise e.exceptions[0]
+        return [done[idx] for idx in range(total)]
+
+    def _group(self, partials: list) -> list:
+        """Kelompokkan hasil parsial sampai batas karakter satu request reduce"""
+        groups, current, size = [], [], 0
+        for text in partials:
+            # Minimal dua per grup supaya setiap level pasti menyusut
+            if len(current) >= 2 and size + len(text) > self.reduce_chars:
+                groups.append(current)
+                current, size = [], 0
+            current.append(text)
+            size += len(text)
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        elif current:
+            groups.append(current)
+        return groups
+
+    async def run(self, on_progress=None) -> str:
+        """Jalankan job; `on_progress(text)` dipanggil setiap chunk/grup selesai"""
+        if not os.path.getsize(self.path):
+            raise ValueError(f"File {self.name} kosong")
+
+        cached = {"count": 0}
+
+        def report(level: int, finished: int, total: int):
+            if not on_progress:
+                return
+            stage = "Map" if level == 0 else f"Reduce level {level}"
+            text = f"🗺️ {stage}: {finished}/{total}"
+            if level == 0 and cached["count"]:
+                text += f" ({cached['count']} dari cache)"
+            if self.retries:
+                text += f" • retry {self.retries}"
+            on_progress(text)
+
+        self.cache = MapReduceCache(self.cache_path)
+        try:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                spans = list(iter_spans(mm, self.chunk_bytes))
+                total = len(spans)
+                done = self.cache.load(0)
+                cached["count"] = len(done)
+                report(0, len(done), total)
+
+                def map_prompt(idx, start, end):
+                    return lambda: MAP_PROMPT.format(
+                        instruction=self.instruction, index=idx + 1, total=total, name=self.name,
+                        text=mm[start:end].decode("utf-8", errors="replace")
+                    )
+
+                jobs = [(idx, map_prompt(idx, start, end)) for idx, (start, end) in enumerate(spans)]
+                partials = await self._run_pool(jobs, total, done, 0, report)
+
+            level = 1
+            while len(partials) > 1:
+                groups = self._group(partials)
+                done = self.cache.load(level)
+                report(level, len(done), len(groups))
+
+                def reduce_prompt(group):
+                    parts = "\n\n".join(f"[Hasil {i + 1}]\n{text}" for i, text in enumerate(group))
+                    return lambda: REDUCE_PROMPT.format(instruction=self.instruction, name=self.name, parts=parts)
+
+                jobs = [(idx, reduce_prompt(group)) for idx, group in enumerate(groups)]
+                partials = await self._run_pool(jobs, len(groups), done, level, report)
+                level += 1
+            return partials[0]
+        finally:
+            self.cache.close()
@@ -1,4 +1,6 @@
 from rich.console import Console
+from rich.table import Table
+from clients.router import AUTO_PROVIDER, QUALITY_TIERS
 
 class ProviderManager:
     """Manage AI providers dan model selection"""
@@ -11,33 +13,67 @@ class ProviderManager:
     
     def _get_default_model(self):
         """Get default model for current provider"""
-        client = self.client_manager.get_client(self.current_provider)
-        return list(client.available_models.values())[0]["name"]
+        return self.client_manager.default_model(self.current_provider)
     
     def get_available_providers(self):
         """Get available providers"""
         return self.client_manager.get_available_providers()
     
+    def show_route_scores(self):
+        """Tabel skor live router 'auto' (EWMA dari traffic dan probe)"""
+        tier = self.current_model if self.current_provider == AUTO_PROVIDER else None
+        scores = self.client_manager.router.scores(self.client_manager, tier)
+        if not scores:
+            self.console.print("ℹ️ [yellow]Tidak ada kandidat untuk mode auto[/yellow]")
+            return
+        
+        table = Table(title=f"Skor Auto Routing (tier {tier or self.client_manager.settings.route_tier})")
+        table.add_column("Provider/Model", style="cyan")
+        table.add_column("TTFT", justify="right")
+        table.add_column("Tok/s", justify="right")
+        table.add_column("Error", justify="right")
+        table.add_column("Sampel", justify="right")
+        table.add_column("Status")
+        for (provider, model), stats in scores:
+            if not stats.samples:
+                status = "[dim]belum diukur[/dim]"
+            elif stats.healthy:
+                status = "[green]sehat[/green]"
+            else:
+                status = f"[red]error[/red] {stats.last_error}"
+            table.add_row(
+                f"{provider}/{model}",
+                f"{stats.ttft:.2f}s" if stats.ttft is not None else "-",
+                f"{stats.tokens_per_sec:.0f}" if stats.tokens_per_sec else "-",
+                f"{stats.error_rate:.0%}",
+                str(stats.samples),
+                status
+            )
+        self.console.print(table)
+    
     def change_provider(self):
         """Change AI provider"""
         providers = self.get_available_providers()
-        
-        if len(providers) <= 1:
-            self.console.print("ℹ️ [yellow]Hanya satu provider yang tersedia[/yellow]")
-            return False
+        # Mode auto: provider/model tercepat yang sehat dipilih per request
+        providers[str(len(providers) + 1)] = AUTO_PROVIDER
         
         self.console.print("\n[bold cyan]🔄 Ganti Provider AI:[/bold cyan]")
         for key, provider in providers.items():
             status = " ✅" if provider == self.current_provider else ""
             self.console.print(f"  [yellow]{key}.[/yellow] {provider.upper()}{status}")
+        self.console.print()
+        self.show_route_scores()
         
         choice = input("\nPilih provider atau 'cancel': ").strip()
         
         if choice in providers:
             self.current_provider = providers[choice]
-            # Reset to default model for new provider
-            client = self.client_manager.get_client(self.current_provider)
-            self.current_model = list(client.available_models.values())[0]["name"]
+            if self.current_provider == AUTO_PROVIDER:
+                # Untuk 'auto', model = tier kualitas
+                self.current_model = self.client_manager.settings.route_tier
+            else:
+                # Reset to default model for new provider
+                self.current_model = self.client_manager.default_model(self.current_provider)
             self.console.print(f"🔄 [green]Berhasil ganti ke: {self.current_provider.upper()}[/green]")
             return True
         elif choice.lower() == 'cancel':
@@ -49,12 +85,15 @@ class ProviderManager:
     
     def change_model(self):
         """Change AI model"""
+        if self.current_provider == AUTO_PROVIDER:
+            return self.change_tier()
         client = self.client_manager.get_client(self.current_provider)
         if not client:
             self.console.print("❌ [red]Tidak ada provider yang aktif[/red]")
             return False
         
-        models = client.available_models
+        # Dari cache catalog (instan), fallback ke daftar bawaan saat offline
+        models = self.client_manager.get_models(self.current_provider)
         self.console.print(f"\n[bold cyan]🤖 Model {self.current_provider.upper()} yang Tersedia:[/bold cyan]")
         for key, model_info in models.items():
             status = " ✅" if model_info["name"] == self.current_model else ""
@@ -72,3 +111,24 @@ class ProviderManager:
         else:
             self.console.print("❌ [red]Pilihan tidak valid![/red]")
             return False
+    
+    def change_tier(self):
+        """Ganti tier kualitas minimum untuk provider 'auto'"""
+        tiers = {str(i + 1): name for i, name in enumerate(QUALITY_TIERS)}
+        self.console.print("\n[bold cyan]🤖 Tier Kualitas Auto Routing:[/bold cyan]")
+        for key, tier in tiers.items():
+            status = " ✅" if tier == self.current_model else ""
+            self.console.print(f"  [yellow]{key}.[/yellow] {tier}{status}")
+        
+        choice = input("\nPilih tier atau 'cancel': ").strip()
+        
+        if choice in tiers:
+            self.current_model = tiers[choice]
+            self.console.print(f"🔄 [green]Berhasil ganti tier ke: {self.current_model}[/green]")
+            return True
+        elif choice.lower() == 'cancel':
+            self.console.print("❌ [yellow]Batal mengganti tier[/yellow]")
+            return False
+        else:
+            self.console.print("❌ [red]Pilihan tidak valid![/red]")
+            return False
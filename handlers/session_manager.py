@@ -1,41 +1,155 @@
-from models.chat_models import ChatHistory
+import os
+import uuid
+from models.chat_models import ChatHistory, Usage
+from clients.usage_tracker import BudgetExceeded
+from clients.deadline import DeadlineExceeded
+from clients.router import AUTO_PROVIDER
+from utils.attachments import Attachment, build_context
+from .map_reduce import MapReduceJob
+from utils.profiling import timed, timed_iter
 
 class SessionManager:
     """Manage chat sessions dan history"""
     
     def __init__(self, settings):
         self.settings = settings
-        self.history = ChatHistory()
+        self.history = ChatHistory(settings.max_history_length)
         self.use_markdown = True
+        # Identitas sesi untuk akumulasi token usage
+        self.session_id = uuid.uuid4().hex[:8]
+        self.last_usage = None
+        self.last_warning = ""
+        # Deadline yang terlewati pada response terakhir (None jika selesai normal)
+        self.last_deadline = None
+        # Pasangan (provider, model) yang dipakai response terakhir (penting untuk 'auto')
+        self.last_route = None
+        # True jika response terakhir sudah dirender live ke console oleh StreamHandler
+        self.last_rendered = False
+        # Lampiran aktif, key = attachment id
+        self.attachments = {}
     
-    def get_ai_response(self, client_manager, provider: str, model: str, user_input: str) -> str:
-        """Get AI response untuk chat session"""
+    def attach(self, path: str) -> Attachment:
+        """Index file sebagai lampiran sesi ini (index dipakai ulang jika ada)"""
+        attachment = Attachment(
+            os.path.expanduser(path),
+            os.path.join(self.settings.cache_dir, "attachments"),
+            self.settings.attach_chunk_tokens
+        )
+        self.attachments[attachment.id] = attachment
+        return attachment
+    
+    def detach(self, attachment_id: str) -> bool:
+        return self.attachments.pop(attachment_id, None) is not None
+    
+    async def map_reduce(self, client_manager, path: str, instruction: str, on_progress=None) -> str:
+        """Jalankan /mapreduce; hasil akhirnya masuk history sebagai satu giliran"""
+        job = MapReduceJob(client_manager, self.settings, path, instruction, session=self.session_id)
+        result = await job.run(on_progress)
+        self.history.add_message("user", f"/mapreduce {job.name} {instruction}")
+        self.history.add_message("assistant", result)
+        return result
+    
+    def fork(self, name: str = None) -> str:
+        """Branch baru dari posisi history sekarang"""
+        return self.history.fork(name)
+    
+    def switch_branch(self, name: str) -> bool:
+        return self.history.switch(name)
+    
+    def rewind(self):
+        """Siapkan regenerate: return (pesan user terakhir, branch jawaban lama) atau None"""
+        rewound = self.history.rewind()
+        if not rewound:
+            return None
+        message, saved = rewound
+        return message.content, saved
+    
+    def _with_context(self, user_input: str) -> str:
+        """Prompt untuk giliran ini: chunk lampiran yang relevan + pertanyaan"""
+        context = build_context(
+            list(self.attachments.values()), user_input, self.settings.attach_context_tokens
+        )
+        return f"{context}\n\n{user_input}" if context else user_input
+    
+    def _collect_usage(self, stream):
+        """Teruskan text deltas; Usage di akhir stream disimpan ke last_usage
+        
+        Deadline yang terlewati mengakhiri stream dengan normal (partial output
+        tetap dipakai) dan disimpan ke last_deadline.
+        """
+        try:
+            for item in stream:
+                if isinstance(item, Usage):
+                    self.last_usage = item
+                else:
+                    yield item
+        except DeadlineExceeded as e:
+            self.last_deadline = e
+    
+    @timed("session_manager.get_ai_response")
+    def get_ai_response(self, client_manager, provider: str, model: str, user_input: str, on_chunk=None) -> str:
+        """Get AI response untuk chat session
+        
+        Jika `on_chunk` diberikan, setiap text delta dikirim ke callback
+        tersebut (misalnya widget Textual) alih-alih dirender ke console.
+        Untuk provider 'auto', `model` adalah tier kualitas dan pasangan
+        provider/model dipilih ulang setiap request oleh router latency.
+        """
+        self.last_rendered = False
+        if provider == AUTO_PROVIDER:
+            try:
+                provider, model = client_manager.route(model)
+            except ValueError as e:
+                return f"**Error**: {e}"
         client = client_manager.get_client(provider)
         if not client:
             return "**Error**: Provider tidak tersedia!"
+        if not model:
+            # Provider yang modelnya belum diketahui saat sesi dibuat
+            try:
+                model = client_manager.default_model(provider, discover=True)
+            except ValueError as e:
+                return f"**Error**: {e}"
+        self.last_route = (provider, model)
         
-        # Prepare messages based on provider
+        # Prepare messages based on provider; konteks lampiran hanya untuk giliran ini
+        prompt = self._with_context(user_input)
         if provider == "gemini":
-            messages = self.history.to_gemini_format() + [user_input]
+            messages = self.history.to_gemini_format() + [prompt]
         else:
-            messages = self.history.to_openai_format() + [{"role": "user", "content": user_input}]
+            messages = self.history.to_openai_format() + [{"role": "user", "content": prompt}]
         
-        # Get response dengan markdown
-        full_response = client.stream_response(
-            messages, 
-            model, 
-            self.use_markdown
-        )
+        self.last_usage = None
+        self.last_deadline = None
+        try:
+            self.last_warning = client_manager.check_budget(messages)
+        except BudgetExceeded as e:
+            self.last_warning = ""
+            return f"**Budget habis**: {e}"
+        
+        stream = self._collect_usage(client_manager.iter_text(provider, messages, model, session=self.session_id))
+        if on_chunk:
+            full_response = ""
+            for text_chunk in timed_iter(stream):
+                full_response += text_chunk
+                on_chunk(text_chunk)
+        else:
+            # Get response dengan markdown
+            full_response = client.stream_response(
+                messages, 
+                model, 
+                self.use_markdown,
+                stream=stream
+            )
+            self.last_rendered = bool(full_response)
         
         if full_response:
-            # Update history
-            self.history.add_message("user", user_input)
+            # Update history (jawaban yang terpotong deadline tetap disimpan)
+            self.history.add_message("user", user_input, list(self.attachments))
             self.history.add_message("assistant", full_response)
-            
-            # Trim history if too long
-            if len(self.history.messages) > self.settings.max_history_length:
-                self.history.messages = self.history.messages[-self.settings.max_history_length:]
-            
+        if self.last_deadline:
+            return f"{full_response or ''}\n\n**Timeout**: {self.last_deadline}".lstrip()
+        if full_response:
             return full_response
         
         return "**Maaf**, tidak ada response dari AI."
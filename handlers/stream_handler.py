@@ -1,6 +1,7 @@
 from rich.console import Console
 from typing import Generator, Any
 from utils.formatters import format_markdown_stream, format_plain_stream
+from utils.profiling import timed
 
 class StreamHandler:
     """Handle streaming responses from AI providers"""
@@ -8,6 +9,7 @@ class StreamHandler:
     def __init__(self, console: Console):
         self.console = console
     
+    @timed("stream_handler.handle_stream")
     def handle_stream(self, stream: Generator, use_markdown: bool = True, style: str = "cyan") -> str:
         """Handle streaming response with formatting"""
         if use_markdown:
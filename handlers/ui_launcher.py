@@ -41,9 +41,16 @@ class UILauncher:
                 if not user_input:
                     continue
                 
+                self.console.print("AI:")
                 response = chat_handler._get_ai_response(user_input)
-                if response:
-                    self.console.print(f"AI: {response}\n")
+                session_manager = chat_handler.session_manager
+                if session_manager.last_deadline:
+                    self.console.print(f"⏱️ [yellow]Timeout: {session_manager.last_deadline}[/yellow]")
+                elif response and not session_manager.last_rendered:
+                    # Pesan budget/error/kosong tidak melewati StreamHandler
+                    self.console.print(response)
+                # Jawaban yang di-stream sudah dirender live, tidak dicetak ulang
+                self.console.print()
                     
             except KeyboardInterrupt:
                 break
@@ -5,7 +5,9 @@ Author: Aidomx
 Version: 1.0
 """
 
+import os
 import sys
+import argparse
 from rich.console import Console
 
 # Import modular components
@@ -13,16 +15,135 @@ from config.settings import Settings
 from clients import ClientManager
 from handlers.chat_handler import ChatHandler
 
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Terai - Terminal AI")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Jalankan sebagai daemon (dipakai oleh terai_client.py)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Jalankan gateway lokal kompatibel OpenAI (/v1/chat/completions, /v1/models)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="Port gateway (default TERAI_GATEWAY_PORT atau 8765)"
+    )
+    parser.add_argument(
+        "-p", "--prompt",
+        help="Mode headless: kirim satu prompt dan stream jawaban mentah ke stdout (stdin ikut ditambahkan jika di-pipe)"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Mode headless: output event NDJSON (delta, usage, timings, done)"
+    )
+    parser.add_argument(
+        "--provider",
+        help="Provider untuk mode headless (default provider pertama)"
+    )
+    parser.add_argument(
+        "-m", "--model",
+        help="Model untuk mode headless; bisa 'provider/model'"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profiling sesi (cProfile, tracemalloc, timing span); report ditulis saat keluar"
+    )
+    return parser.parse_args()
+
+def run_daemon(settings, client_manager, console):
+    """Run background daemon over Unix socket"""
+    import asyncio
+    from server.daemon import TeraiDaemon
+    
+    daemon = TeraiDaemon(client_manager, settings, console)
+    try:
+        asyncio.run(daemon.serve_forever())
+    except KeyboardInterrupt:
+        console.print("\n👋 [bold yellow]Daemon dihentikan[/bold yellow]")
+
+def run_gateway(settings, client_manager, console):
+    """Run OpenAI-compatible gateway server"""
+    import asyncio
+    from server.gateway import GatewayServer
+    
+    gateway = GatewayServer(client_manager, settings, console)
+    try:
+        asyncio.run(gateway.serve_forever())
+    except KeyboardInterrupt:
+        console.print("\n👋 [bold yellow]Gateway dihentikan[/bold yellow]")
+
+def is_headless(args) -> bool:
+    """Headless jika ada -p/--json atau stdin di-pipe (bukan mode server)"""
+    if args.daemon or args.serve:
+        return False
+    return args.prompt is not None or args.json or not sys.stdin.isatty()
+
+def read_prompt(args) -> str:
+    """Prompt dari -p, ditambah isi stdin jika di-pipe"""
+    parts = [args.prompt] if args.prompt else []
+    if not sys.stdin.isatty():
+        piped = sys.stdin.read()
+        if piped.strip():
+            parts.append(piped)
+    return "\n\n".join(parts).strip()
+
+def run_headless(args, settings, client_manager):
+    """Run satu prompt tanpa UI; exit code mengikuti hasilnya"""
+    from handlers.headless import HeadlessRunner
+    
+    prompt = read_prompt(args)
+    if not prompt:
+        sys.stderr.write("terai: prompt kosong (gunakan -p \"pertanyaan\" atau pipe ke stdin)\n")
+        sys.exit(2)
+    runner = HeadlessRunner(client_manager, settings)
+    code = runner.run(prompt, args.provider, args.model, args.json)
+    if code:
+        sys.exit(code)
+
 def main():
     """Main function"""
+    args = parse_args()
+    # Initialize rich console; di mode headless stdout hanya untuk jawaban
+    console = Console(stderr=is_headless(args))
+    profiler = None
+    if args.profile:
+        from utils.profiling import Profiler
+        profiler = Profiler(os.getenv("TERAI_PROFILE_DIR") or ".")
+        profiler.start()
+    try:
+        run(args, console)
+    finally:
+        if profiler:
+            console.print(f"📊 [cyan]Report profiling: {profiler.stop()}[/cyan]")
+
+def run(args, console):
+    """Run selected mode"""
     try:
-        # Initialize rich console
-        console = Console()
         # Load settings
         settings = Settings()
+        if args.port:
+            settings.gateway_port = args.port
         settings.validate_api_keys()
         # Initialize clients
         client_manager = ClientManager(settings, console)
+        if is_headless(args):
+            return run_headless(args, settings, client_manager)
+        # Probe latency berkala untuk provider 'auto' (jika diaktifkan)
+        client_manager.start_route_probes()
+        if args.daemon:
+            return run_daemon(settings, client_manager, console)
+        if args.serve:
+            client_manager.refresh_models_in_background()
+            return run_gateway(settings, client_manager, console)
+        # Refresh daftar model di background, startup tidak menunggu network
+        client_manager.refresh_models_in_background()
         # Initialize chat handler
         chat_handler = ChatHandler(client_manager, console, settings)
         # Show welcome
@@ -1,6 +1,8 @@
-from .chat_models import Message, ChatHistory
+from .chat_models import Message, HistoryNode, ChatHistory, Usage
 
 __all__ = [
     'Message',
-    'ChatHistory'
+    'HistoryNode',
+    'ChatHistory',
+    'Usage'
 ]
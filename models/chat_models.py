@@ -1,37 +1,172 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any
 
 @dataclass
 class Message:
     role: str  # "user" or "assistant"
     content: str
+    # ID lampiran yang aktif saat pesan dikirim (isi file tidak disalin ke history)
+    attachments: List[str] = field(default_factory=list)
 
 @dataclass
+class Usage:
+    """Token usage satu request (dikirim sebagai item terakhir di stream)"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+    
+    def add(self, other: "Usage"):
+        """Jumlahkan usage (misalnya beberapa percobaan stream)"""
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cached_tokens += other.cached_tokens
+
+class HistoryNode:
+    """Satu pesan di history tree
+    
+    Node tidak pernah diubah setelah dibuat (kecuali pemotongan parent di
+    luar window), sehingga prefix percakapan dibagi oleh semua branch
+    (fork = O(1)). Hasil konversi format provider di-cache per node, hanya
+    untuk pesan node itu sendiri.
+    """
+    __slots__ = ("message", "parent", "depth", "_formats")
+    
+    def __init__(self, message: Message, parent: "HistoryNode" = None):
+        self.message = message
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 1
+        self._formats = {}
+    
+    def path(self, limit: int = None) -> List["HistoryNode"]:
+        """Node dari root (atau `limit` terakhir) sampai node ini"""
+        nodes = []
+        node = self
+        while node and (not limit or len(nodes) < limit):
+            nodes.append(node)
+            node = node.parent
+        nodes.reverse()
+        return nodes
+    
+    def formatted(self, name: str, convert):
+        """Pesan node ini dalam format provider (di-cache per format)"""
+        value = self._formats.get(name)
+        if value is None:
+            value = self._formats[name] = convert(self.message)
+        return value
+    
+    def is_ancestor_of(self, node: "HistoryNode") -> bool:
+        """True jika node ini ada di path `node` (termasuk node itu sendiri)"""
+        while node and node.depth > self.depth:
+            node = node.parent
+        return node is self
+
 class ChatHistory:
-    messages: List[Message]
+    """History percakapan berbentuk tree dengan beberapa branch
+    
+    Setiap branch hanya menyimpan pointer ke node terakhirnya; `messages`
+    adalah path dari root ke node tersebut (dibatasi `max_length`). Node
+    yang sudah di luar window semua branch dilepas supaya bisa di-GC.
+    """
+    DEFAULT_BRANCH = "main"
     
-    def __init__(self):
-        self.messages = []
+    def __init__(self, max_length: int = None):
+        self.max_length = max_length
+        self.branch = self.DEFAULT_BRANCH
+        self.branches = {self.branch: None}
+        self._fork_counter = 0
     
-    def add_message(self, role: str, content: str):
+    @property
+    def head(self) -> HistoryNode:
+        return self.branches[self.branch]
+    
+    @head.setter
+    def head(self, node: HistoryNode):
+        self.branches[self.branch] = node
+    
+    @property
+    def messages(self) -> List[Message]:
+        """Pesan di branch aktif (maksimal `max_length` terakhir)"""
+        return [node.message for node in self._window()]
+    
+    def _window(self) -> List[HistoryNode]:
+        return self.head.path(self.max_length) if self.head else []
+    
+    def add_message(self, role: str, content: str, attachments: List[str] = None):
         """Add a message to history"""
-        self.messages.append(Message(role=role, content=content))
+        self.head = HistoryNode(Message(role=role, content=content, attachments=list(attachments or [])), self.head)
+        self._prune()
+    
+    def _prune(self):
+        """Lepas pesan sebelum window branch aktif jika tidak ada di window branch lain"""
+        if not self.max_length:
+            return
+        oldest = self.head.path(self.max_length)[0]
+        if not oldest.parent:
+            return
+        for head in self.branches.values():
+            if head is None or head is self.head:
+                continue
+            # Window branch lain masih mencakup parent `oldest`
+            if head.depth - oldest.depth + 1 < self.max_length and oldest.is_ancestor_of(head):
+                return
+        oldest.parent = None
     
     def get_recent_messages(self, max_exchanges: int = 10) -> List[Message]:
         """Get recent messages (last n exchanges)"""
         return self.messages[-(max_exchanges * 2):]
     
     def clear(self):
-        """Clear chat history"""
-        self.messages.clear()
+        """Clear chat history (branch aktif)"""
+        self.head = None
+    
+    def _new_branch_name(self) -> str:
+        while True:
+            self._fork_counter += 1
+            name = f"fork-{self._fork_counter}"
+            if name not in self.branches:
+                return name
+    
+    def fork(self, name: str = None) -> str:
+        """Buat branch baru dari posisi sekarang dan pindah ke sana (O(1))"""
+        name = name or self._new_branch_name()
+        self.branches[name] = self.head
+        self.branch = name
+        return name
+    
+    def switch(self, name: str) -> bool:
+        """Pindah ke branch lain"""
+        if name not in self.branches:
+            return False
+        self.branch = name
+        return True
+    
+    def rewind(self):
+        """Mundur ke sebelum pesan user terakhir untuk regenerate
+        
+        Jawaban lama tetap tersimpan sebagai branch baru. Return
+        (pesan user terakhir, nama branch lama) atau None jika belum ada.
+        """
+        node = self.head
+        while node and node.message.role != "user":
+            node = node.parent
+        if not node:
+            return None
+        saved = self._new_branch_name()
+        self.branches[saved] = self.head
+        self.head = node.parent
+        return node.message, saved
     
     def to_gemini_format(self) -> List[str]:
         """Convert to Gemini format"""
-        return [msg.content for msg in self.messages]
+        return [node.formatted("gemini", lambda msg: msg.content) for node in self._window()]
     
     def to_openai_format(self) -> List[Dict[str, str]]:
         """Convert to OpenAI format"""
-        return [{"role": msg.role, "content": msg.content} for msg in self.messages]
+        return [node.formatted("openai", lambda msg: {"role": msg.role, "content": msg.content}) for node in self._window()]
     
     @property
     def length(self) -> int:
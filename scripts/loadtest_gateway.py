@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Load test gateway (`python main.py --serve`) terhadap mock upstream lokal.
+
+Mock upstream berjalan di proses terpisah; ClientManager diarahkan ke mock
+tersebut dan GatewayServer berjalan di proses ini, lalu N stream SSE dibuka
+bersamaan.
+
+    python scripts/loadtest_gateway.py --streams 300 --chunks 50 --delay 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_upstream(args):
+    """Jalankan mock_upstream.py di proses terpisah"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPTS_DIR, "mock_upstream.py"),
+         "--port", str(port), "--chunks", str(args.chunks), "--delay", str(args.delay)],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    process.stdout.readline()  # tunggu sampai siap
+    return process, f"http://127.0.0.1:{port}/v1", port
+
+async def upstream_stats(port: int) -> dict:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /stats HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return json.loads(data.split(b"\r\n\r\n", 1)[1])
+
+async def stream_request(port: int, model: str, client_id: int) -> dict:
+    """Satu request SSE mentah; return timing dan jumlah chunk"""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps({
+        "model": model,
+        "stream": True,
+        "messages": [{"role": "user", "content": f"halo {client_id}"}]
+    }).encode()
+    writer.write(
+        b"POST /v1/chat/completions HTTP/1.1\r\nHost: localhost\r\n"
+        b"Content-Type: application/json\r\nConnection: close\r\n"
+        b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+    )
+    await writer.drain()
+
+    status = (await reader.readline()).split()[1]
+    first_token = None
+    chunks = 0
+    done = False
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if line.startswith(b"data: "):
+            data = line[6:].strip()
+            if data == b"[DONE]":
+                done = True
+                break
+            if b'"content"' in data:
+                chunks += 1
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+    writer.close()
+    return {
+        "ok": status == b"200" and done,
+        "ttft": first_token or 0.0,
+        "total": time.perf_counter() - started,
+        "chunks": chunks
+    }
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+async def run(args):
+    upstream, base_url, upstream_port = start_upstream(args)
+
+    # Arahkan OpenAI SDK ke mock, nonaktifkan Gemini
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "mock-key"
+    os.environ["GEMINI_API_KEY"] = ""
+
+    from rich.console import Console
+    from config.settings import Settings
+    from clients import ClientManager
+    from server.gateway import GatewayServer
+
+    console = Console(stderr=True)
+    settings = Settings()
+    settings.gateway_port = 0
+    settings.gateway_client_concurrency = args.streams
+    settings.gateway_max_queue = args.streams
+    client_manager = ClientManager(settings, console)
+    gateway = GatewayServer(client_manager, settings, console)
+
+    server = await asyncio.start_server(gateway.handle_connection, "127.0.0.1", 0, backlog=4096)
+    port = server.sockets[0].getsockname()[1]
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(stream_request(port, "gpt-4o-mini", i) for i in range(args.streams)),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+
+    ok = [r for r in results if isinstance(r, dict) and r["ok"]]
+    failed = len(results) - len(ok)
+    ttfts = [r["ttft"] for r in ok]
+    totals = [r["total"] for r in ok]
+    ideal = args.chunks * args.delay
+    stats = await upstream_stats(upstream_port)
+
+    print(f"Streams        : {args.streams} bersamaan ({len(ok)} sukses, {failed} gagal)")
+    print(f"Durasi total   : {elapsed:.2f}s (ideal satu stream {ideal:.2f}s)")
+    print(f"TTFT p50/p95   : {statistics.median(ttfts) * 1000:.0f} / {_pct(ttfts, 0.95) * 1000:.0f} ms" if ttfts else "TTFT           : -")
+    print(f"Total p50/p95  : {statistics.median(totals):.2f} / {_pct(totals, 0.95):.2f} s" if totals else "Total          : -")
+    print(f"Chunk/detik    : {sum(r['chunks'] for r in ok) / elapsed:.0f}")
+    print(f"Upstream       : {stats['requests']} request, puncak {stats['peak_active']} stream aktif, {stats['connections']} koneksi TCP")
+
+    server.close()
+    upstream.terminate()
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test Terai gateway")
+    parser.add_argument("--streams", type=int, default=300)
+    parser.add_argument("--chunks", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.02)
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Mock upstream kompatibel OpenAI untuk load test dan pengujian lokal.
+
+    python scripts/mock_upstream.py --port 9900 --chunks 50 --delay 0.02
+
+Lalu arahkan Terai ke sana dengan OPENAI_BASE_URL=http://127.0.0.1:9900/v1, atau
+sebagai provider kompatibel OpenAI:
+
+    python scripts/mock_upstream.py --port 9900 --models llama-3.1-8b
+    TERAI_COMPAT_PROVIDERS=local TERAI_COMPAT_LOCAL_BASE_URL=http://127.0.0.1:9900/v1 python main.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.http import HTTPError, SSEWriter, read_request, write_error, write_json
+
+class MockUpstream:
+    """Upstream palsu: setiap request di-stream sebagai `chunks` token"""
+
+    def __init__(self, chunks: int = 50, delay: float = 0.02, models=("gpt-4o", "gpt-4o-mini")):
+        self.chunks = chunks
+        self.delay = delay
+        self.models = list(models)
+        self.requests = 0
+        self.active = 0
+        self.peak_active = 0
+        self.connections = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self.server = await asyncio.start_server(self.handle_connection, host, port, backlog=2048)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    await write_error(writer, e.status, e.message, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                if request.path == "/v1/models":
+                    await write_json(writer, 200, {
+                        "object": "list",
+                        "data": [{"id": m, "object": "model", "created": 0, "owned_by": "mock"} for m in self.models]
+                    })
+                elif request.path == "/v1/chat/completions":
+                    await self.chat(request, writer)
+                elif request.path == "/stats":
+                    await write_json(writer, 200, {
+                        "requests": self.requests,
+                        "peak_active": self.peak_active,
+                        "connections": self.connections
+                    })
+                else:
+                    await write_error(writer, 404, "Not found")
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def usage(self, body: dict) -> dict:
+        prompt = sum(len(str(msg.get("content", ""))) for msg in body.get("messages", [])) // 4
+        return {
+            "prompt_tokens": prompt,
+            "completion_tokens": self.chunks,
+            "total_tokens": prompt + self.chunks,
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+
+    async def chat(self, request, writer):
+        body = request.json()
+        self.requests += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            created = int(time.time())
+            chunk = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model", ""),
+                "choices": [{"index": 0, "delta": {}, "finish_reason": None}]
+            }
+            if not body.get("stream"):
+                await asyncio.sleep(self.delay * self.chunks)
+                await write_json(writer, 200, {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": body.get("model", ""),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": "tok " * self.chunks}, "finish_reason": "stop"}],
+                    "usage": self.usage(body)
+                })
+                return
+
+            sse = SSEWriter(writer)
+            await sse.start()
+            for i in range(self.chunks):
+                await asyncio.sleep(self.delay)
+                chunk["choices"][0]["delta"] = {"content": f"tok{i} "}
+                await sse.send(json.dumps(chunk))
+            chunk["choices"][0]["delta"] = {}
+            chunk["choices"][0]["finish_reason"] = "stop"
+            await sse.send(json.dumps(chunk))
+            if (body.get("stream_options") or {}).get("include_usage"):
+                chunk["choices"] = []
+                chunk["usage"] = self.usage(body)
+                await sse.send(json.dumps(chunk))
+            await sse.send("[DONE]")
+            await sse.close()
+        finally:
+            self.active -= 1
+
+async def _main(args):
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+    upstream = await MockUpstream(args.chunks, args.delay, models).start(args.host, args.port)
+    print(f"Mock upstream berjalan di {upstream.base_url}", flush=True)
+    async with upstream.server:
+        await upstream.server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock upstream kompatibel OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9900)
+    parser.add_argument("--chunks", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--models", default="gpt-4o,gpt-4o-mini", help="Model yang dilaporkan /v1/models")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,7 @@
+from .daemon import TeraiDaemon
+from .gateway import GatewayServer
+
+__all__ = [
+    'TeraiDaemon',
+    'GatewayServer'
+]
@@ -0,0 +1,175 @@
+# server/daemon.py
+import asyncio
+import json
+import os
+import socket
+from rich.console import Console
+from handlers.chat_session import ChatSession
+
+class TeraiDaemon:
+    """Daemon yang menyimpan ClientManager dan sesi chat tetap di memori
+    
+    Client tipis (terai_client.py) terhubung lewat Unix domain socket dan
+    bertukar pesan NDJSON: satu object JSON per baris.
+    
+    Request:  {"type": "chat", "session": "...", "message": "..."}
+              {"type": "command", "session": "...", "name": "provider|model|clear|info", "value": "..."}
+    Response: {"type": "delta", "text": "..."} ... {"type": "done"}
+              {"type": "info", ...} / {"type": "error", "message": "..."}
+    """
+    
+    def __init__(self, client_manager, settings, console: Console, socket_path: str = None):
+        self.client_manager = client_manager
+        self.settings = settings
+        self.console = console
+        self.socket_path = socket_path or settings.socket_path
+        self.sessions = {}
+        self._session_locks = {}
+    
+    def get_session(self, name: str) -> ChatSession:
+        """Get atau buat sesi bernama (state tetap ada antar koneksi client)"""
+        if name not in self.sessions:
+            provider = list(self.client_manager.clients.keys())[0]
+            self.sessions[name] = ChatSession(
+                self.client_manager,
+                self.settings,
+                provider,
+                self.client_manager.default_model(provider)
+            )
+            self.sessions[name].session_manager.session_id = f"daemon:{name}"
+            self._session_locks[name] = asyncio.Lock()
+        return self.sessions[name]
+    
+    async def serve_forever(self):
+        """Jalankan server Unix socket"""
+        if self._daemon_running():
+            self.console.print(f"⚠️  [yellow]Daemon lain sudah berjalan di {self.socket_path}[/yellow]")
+            return
+        self._remove_stale_socket()
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        server = await asyncio.start_unix_server(self.handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        # Panaskan koneksi TLS sekaligus refresh catalog model, lalu jaga tetap hangat
+        self.client_manager.refresh_models_in_background(force=True)
+        self.client_manager.start_keep_warm()
+        self.console.print(f"🟢 [green]Terai daemon berjalan di {self.socket_path}[/green]")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._remove_stale_socket()
+    
+    def _daemon_running(self) -> bool:
+        """Socket masih menerima koneksi; hanya socket yang ditolak dianggap sisa"""
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+        finally:
+            probe.close()
+        return True
+    
+    def _remove_stale_socket(self):
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+    
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Layani satu koneksi client; banyak client dilayani bersamaan"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    await self._send(writer, {"type": "error", "message": "Request bukan JSON valid"})
+                    continue
+                
+                if request.get("type") == "chat":
+                    await self.handle_chat(request, writer)
+                elif request.get("type") == "command":
+                    await self.handle_command(request, writer)
+                elif request.get("type") == "ping":
+                    await self._send(writer, {"type": "pong"})
+                else:
+                    await self._send(writer, {"type": "error", "message": "Tipe request tidak dikenal"})
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+    
+    async def handle_chat(self, request: dict, writer: asyncio.StreamWriter):
+        """Stream response AI ke client sebagai event delta"""
+        name = request.get("session") or "default"
+        session = self.get_session(name)
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        
+        def on_chunk(text: str):
+            # Dipanggil dari executor thread
+            loop.call_soon_threadsafe(queue.put_nowait, text)
+        
+        # Satu giliran per sesi; sesi berbeda berjalan bersamaan
+        async with self._session_locks[name]:
+            future = loop.run_in_executor(
+                None, session.get_ai_response, request.get("message", ""), on_chunk
+            )
+            future.add_done_callback(lambda _: queue.put_nowait(None))
+            
+            while True:
+                text = await queue.get()
+                if text is None:
+                    break
+                await self._send(writer, {"type": "delta", "text": text})
+            
+            try:
+                response = future.result()
+                event = {"type": "done", "text": response}
+                if session.last_usage:
+                    event["usage"] = vars(session.last_usage)
+                if session.last_deadline:
+                    event["deadline"] = {"phase": session.last_deadline.phase, "limit": session.last_deadline.limit}
+                await self._send(writer, event)
+            except Exception as e:
+                await self._send(writer, {"type": "error", "message": str(e)})
+    
+    async def handle_command(self, request: dict, writer: asyncio.StreamWriter):
+        """Handle perintah sesi: provider, model, clear, fork, branch, info"""
+        session = self.get_session(request.get("session") or "default")
+        name = request.get("name")
+        value = request.get("value", "")
+        ok = True
+        
+        if name == "provider":
+            ok = session.set_provider(value.lower())
+        elif name == "model":
+            ok = session.set_model(value)
+        elif name == "clear":
+            session.history.clear()
+        elif name == "fork":
+            session.fork(value or None)
+        elif name == "branch":
+            ok = session.switch_branch(value)
+        elif name != "info":
+            await self._send(writer, {"type": "error", "message": f"Perintah '{name}' tidak dikenal"})
+            return
+        
+        if not ok:
+            await self._send(writer, {"type": "error", "message": f"{name.capitalize()} '{value}' tidak tersedia"})
+            return
+        
+        await self._send(writer, {
+            "type": "info",
+            "provider": session.current_provider,
+            "model": session.current_model,
+            "history": session.history.length,
+            "branch": session.history.branch
+        })
+    
+    async def _send(self, writer: asyncio.StreamWriter, event: dict):
+        writer.write(json.dumps(event).encode("utf-8") + b"\n")
+        await writer.drain()
@@ -0,0 +1,277 @@
+# server/gateway.py
+import asyncio
+import json
+import time
+import uuid
+from contextlib import aclosing
+from rich.console import Console
+from clients.usage_tracker import BudgetExceeded
+from clients.router import AUTO_PROVIDER
+from clients.deadline import DeadlineExceeded
+from models.chat_models import Usage
+from .http import HTTPError, SSEWriter, read_request, write_error, write_json
+
+class ClientLimiter:
+    """Batas concurrency per client dengan antrian terbatas
+
+    Request yang melebihi `max_concurrent` menunggu di antrian (FIFO
+    lewat Semaphore); jika antrian penuh request langsung ditolak 429.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int):
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.waiting = 0
+
+    async def __aenter__(self):
+        if self.semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise HTTPError(429, "Terlalu banyak request, antrian penuh")
+            self.waiting += 1
+            try:
+                await self.semaphore.acquire()
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+class GatewayServer:
+    """Gateway lokal kompatibel OpenAI di atas ClientManager
+
+    Endpoint: GET /v1/models dan POST /v1/chat/completions (dengan SSE).
+    Semua request memakai async SDK client yang sama di ClientManager,
+    sehingga koneksi upstream di-pool dan dipakai ulang.
+    """
+
+    def __init__(self, client_manager, settings, console: Console):
+        self.client_manager = client_manager
+        self.settings = settings
+        self.console = console
+        self.limiters = {}
+
+    async def serve_forever(self):
+        """Jalankan HTTP server di host/port dari settings"""
+        server = await asyncio.start_server(
+            self.handle_connection,
+            self.settings.gateway_host,
+            self.settings.gateway_port,
+            backlog=1024
+        )
+        host, port = server.sockets[0].getsockname()[:2]
+        self.console.print(f"🟢 [green]Terai gateway berjalan di http://{host}:{port}/v1[/green]")
+        async with server:
+            await server.serve_forever()
+
+    def _limiter(self, client_id: str) -> ClientLimiter:
+        if client_id not in self.limiters:
+            self.limiters[client_id] = ClientLimiter(
+                self.settings.gateway_client_concurrency,
+                self.settings.gateway_max_queue
+            )
+        return self.limiters[client_id]
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Layani satu koneksi (keep-alive)"""
+        peer = writer.get_extra_info("peername")
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    await write_error(writer, e.status, e.message, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                try:
+                    await self.dispatch(request, writer, peer)
+                except HTTPError as e:
+                    await write_error(writer, e.status, e.message, request.keep_alive)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # Bug di handler tidak boleh memutus koneksi tanpa jawaban
+                    self.console.print(f"❌ [red]Gateway error: {e}[/red]")
+                    await write_error(writer, 500, f"Internal error: {e}", keep_alive=False)
+                    break
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request, writer, peer):
+        """Routing request ke handler"""
+        token = self._bearer_token(request)
+        if self.settings.gateway_token and token != self.settings.gateway_token:
+            raise HTTPError(401, "Token tidak valid")
+
+        if request.path == "/v1/models":
+            if request.method != "GET":
+                raise HTTPError(405, "Gunakan GET")
+            await write_json(writer, 200, self.list_models(), request.keep_alive)
+        elif request.path == "/v1/chat/completions":
+            if request.method != "POST":
+                raise HTTPError(405, "Gunakan POST")
+            # Identitas client: token jika ada, selain itu alamat IP
+            client_id = token or (peer[0] if peer else "local")
+            async with self._limiter(client_id):
+                await self.chat_completions(request, writer)
+        else:
+            raise HTTPError(404, f"Endpoint {request.path} tidak ada")
+
+    def _bearer_token(self, request) -> str:
+        auth = request.headers.get("authorization", "")
+        return auth[7:].strip() if auth.lower().startswith("bearer ") else ""
+
+    def list_models(self) -> dict:
+        """Daftar model semua provider dalam format OpenAI"""
+        data = []
+        for provider in self.client_manager.clients:
+            for info in self.client_manager.get_models(provider).values():
+                data.append({
+                    "id": info["name"],
+                    "object": "model",
+                    "created": 0,
+                    "owned_by": provider
+                })
+        return {"object": "list", "data": data}
+
+    def resolve_model(self, model: str):
+        """Cari provider untuk sebuah model; mendukung 'provider/model'
+        
+        Model 'auto' (atau 'auto/<tier>') dipilih oleh router latency.
+        """
+        provider, _, name = model.partition("/")
+        if provider == AUTO_PROVIDER:
+            try:
+                return self.client_manager.route(name or None)
+            except ValueError as e:
+                raise HTTPError(404, str(e))
+        if name and provider in self.client_manager.clients:
+            return provider, name
+        for provider in self.client_manager.clients:
+            names = [info["name"] for info in self.client_manager.get_models(provider).values()]
+            if model in names:
+                return provider, model
+        raise HTTPError(404, f"Model '{model}' tidak tersedia")
+
+    def _convert_messages(self, provider: str, messages: list) -> list:
+        """Convert pesan OpenAI ke format provider (lihat ChatHistory)"""
+        if provider == "gemini":
+            return [msg.get("content") or "" for msg in messages]
+        return [{"role": msg.get("role", "user"), "content": msg.get("content") or ""} for msg in messages]
+
+    async def chat_completions(self, request, writer):
+        """Handle /v1/chat/completions, streaming maupun non-streaming"""
+        body = request.json()
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Body harus berupa object JSON")
+        messages = body.get("messages")
+        if not body.get("model") or not isinstance(messages, list) or not messages:
+            raise HTTPError(400, "Field 'model' dan 'messages' wajib diisi")
+        if not isinstance(body["model"], str):
+            raise HTTPError(400, "Field 'model' harus berupa string")
+        if not all(isinstance(msg, dict) for msg in messages):
+            raise HTTPError(400, "Setiap item 'messages' harus berupa object")
+
+        provider, model = self.resolve_model(body["model"])
+        messages = self._convert_messages(provider, messages)
+        try:
+            # Budget dicek di SQLite: jangan tahan event loop gateway
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.client_manager.check_budget, messages)
+        except BudgetExceeded as e:
+            raise HTTPError(429, str(e))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        usage = None
+        if body.get("stream"):
+            sse = SSEWriter(writer)
+            started = False
+            try:
+                async with aclosing(self._stream(provider, messages, model)) as stream:
+                    async for text_chunk in stream:
+                        if isinstance(text_chunk, Usage):
+                            usage = text_chunk
+                            continue
+                        if not started:
+                            await sse.start()
+                            started = True
+                        await sse.send(json.dumps(self._chunk(completion_id, created, body["model"], {"content": text_chunk})))
+            except ConnectionError:
+                raise
+            except DeadlineExceeded as e:
+                if not started:
+                    raise HTTPError(504, str(e))
+                await sse.send(json.dumps({"error": {"message": str(e), "type": "deadline_exceeded", "phase": e.phase}}))
+            except Exception as e:
+                if not started:
+                    raise HTTPError(502, f"Upstream error: {e}")
+                await sse.send(json.dumps({"error": {"message": str(e), "type": "upstream_error"}}))
+            else:
+                if not started:
+                    await sse.start()
+                await sse.send(json.dumps(self._chunk(completion_id, created, body["model"], {}, "stop")))
+                if usage and (body.get("stream_options") or {}).get("include_usage"):
+                    chunk = self._chunk(completion_id, created, body["model"], {})
+                    chunk["choices"] = []
+                    chunk["usage"] = self._usage(usage)
+                    await sse.send(json.dumps(chunk))
+            await sse.send("[DONE]")
+            await sse.close()
+            return
+
+        parts = []
+        try:
+            async with aclosing(self._stream(provider, messages, model)) as stream:
+                async for text_chunk in stream:
+                    if isinstance(text_chunk, Usage):
+                        usage = text_chunk
+                    else:
+                        parts.append(text_chunk)
+        except DeadlineExceeded as e:
+            raise HTTPError(504, str(e))
+        except Exception as e:
+            raise HTTPError(502, f"Upstream error: {e}")
+        response = {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(parts)},
+                "finish_reason": "stop"
+            }]
+        }
+        if usage:
+            response["usage"] = self._usage(usage)
+        await write_json(writer, 200, response, request.keep_alive)
+
+    def _chunk(self, completion_id: str, created: int, model: str, delta: dict, finish_reason=None) -> dict:
+        return {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+
+    def _usage(self, usage: Usage) -> dict:
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+            "prompt_tokens_details": {"cached_tokens": usage.cached_tokens}
+        }
+
+    def _stream(self, provider: str, messages: list, model: str):
+        """Async stream upstream lewat ClientManager (pool koneksi bersama)"""
+        return self.client_manager.aiter_text(provider, messages, model, session="gateway")
@@ -0,0 +1,119 @@
+# server/http.py
+"""Minimal HTTP/1.1 di atas asyncio streams (tanpa dependency tambahan)"""
+import json
+from dataclasses import dataclass, field
+from typing import Dict
+
+MAX_HEADER_LINES = 100
+MAX_BODY_SIZE = 32 * 1024 * 1024
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    504: "Gateway Timeout",
+}
+
+class HTTPError(Exception):
+    """Error yang dikirim ke client sebagai response JSON"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    version: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body bukan JSON valid")
+
+async def read_request(reader) -> Request:
+    """Baca satu request; None jika koneksi ditutup"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").strip().split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Request line tidak valid")
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        header_line = await reader.readline()
+        if header_line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header_line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413, "Body terlalu besar")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target.split("?", 1)[0], version, headers, body)
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+async def write_json(writer, status: int, payload, keep_alive: bool = True):
+    """Kirim response JSON dengan Content-Length"""
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(_head(status, {
+        "Content-Type": "application/json",
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+    }) + body)
+    await writer.drain()
+
+async def write_error(writer, status: int, message: str, keep_alive: bool = True):
+    """Kirim error dalam format OpenAI"""
+    await write_json(writer, status, {
+        "error": {"message": message, "type": "terai_gateway_error", "code": status}
+    }, keep_alive)
+
+class SSEWriter:
+    """Server-Sent Events lewat chunked transfer encoding"""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    async def start(self):
+        self.writer.write(_head(200, {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Transfer-Encoding": "chunked",
+            "Connection": "keep-alive",
+        }))
+        await self.writer.drain()
+
+    async def send(self, data: str):
+        payload = f"data: {data}\n\n".encode("utf-8")
+        self.writer.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+        await self.writer.drain()
+
+    async def close(self):
+        self.writer.write(b"0\r\n\r\n")
+        await self.writer.drain()
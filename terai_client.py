@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Terai thin client - terhubung ke daemon (`python main.py --daemon`)
+lewat Unix domain socket. Hanya memakai stdlib supaya startup cepat.
+
+Penggunaan:
+    python terai_client.py                 # mode interaktif
+    python terai_client.py "pertanyaan"    # sekali jalan
+    python terai_client.py --session kerja # pakai sesi bernama
+"""
+
+import json
+import os
+import socket
+import sys
+
+def read_dotenv() -> dict:
+    """Nilai dari .env terdekat (dicari ke atas dari folder ini, seperti load_dotenv)"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return {}
+        directory = parent
+    values = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, _, value = line.removeprefix("export ").partition("=")
+            value = value.strip()
+            quote = value[:1]
+            if quote in ("'", '"') and quote in value[1:]:
+                value = value[1:value.index(quote, 1)]
+            else:
+                value = value.split(" #", 1)[0].strip()
+            values[key.strip()] = value
+    return values
+
+def default_socket_path() -> str:
+    """Harus sama dengan Settings.socket_path (environment menang atas .env)"""
+    dotenv = read_dotenv()
+    def getenv(name):
+        return os.getenv(name) or dotenv.get(name)
+    if getenv("TERAI_SOCKET"):
+        return getenv("TERAI_SOCKET")
+    base = getenv("XDG_RUNTIME_DIR") or getenv("TERAI_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "terai"
+    )
+    return os.path.join(base, "terai.sock")
+
+class DaemonConnection:
+    """Koneksi NDJSON ke Terai daemon"""
+
+    def __init__(self, socket_path: str, session: str):
+        self.session = session
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.reader = self.sock.makefile("r", encoding="utf-8")
+
+    def send(self, request: dict):
+        request["session"] = self.session
+        self.sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+    def events(self):
+        """Yield event sampai done/info/error"""
+        for line in self.reader:
+            event = json.loads(line)
+            yield event
+            if event["type"] in ("done", "info", "error", "pong"):
+                return
+
+    def chat(self, message: str, out=sys.stdout) -> bool:
+        """Kirim pesan dan tulis text delta langsung ke stdout"""
+        self.send({"type": "chat", "message": message})
+        for event in self.events():
+            if event["type"] == "delta":
+                out.write(event["text"])
+                out.flush()
+            elif event["type"] == "error":
+                sys.stderr.write(f"\nError: {event['message']}\n")
+                return False
+        out.write("\n")
+        return True
+
+    def command(self, name: str, value: str = ""):
+        self.send({"type": "command", "name": name, "value": value})
+        for event in self.events():
+            if event["type"] == "info":
+                print(f"[{event['provider']} • {event['model']} • {event['history']} pesan • {event.get('branch', 'main')}]")
+            elif event["type"] == "error":
+                print(f"Error: {event['message']}")
+
+def interactive(conn: DaemonConnection):
+    print("Terai client - ketik 'quit' untuk keluar, /provider, /model, /clear, /fork, /branch, /info")
+    while True:
+        try:
+            user_input = input("\n> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+        if not user_input:
+            continue
+        if user_input.lower() == "quit":
+            break
+        if user_input.startswith("/"):
+            name, _, value = user_input[1:].partition(" ")
+            conn.command(name, value.strip())
+            continue
+        conn.chat(user_input)
+
+def main():
+    args = sys.argv[1:]
+    session = "default"
+    if "--session" in args:
+        index = args.index("--session")
+        session = args[index + 1]
+        del args[index:index + 2]
+
+    try:
+        conn = DaemonConnection(default_socket_path(), session)
+    except OSError:
+        sys.stderr.write("Terai daemon tidak berjalan. Jalankan: python main.py --daemon\n")
+        sys.exit(1)
+
+    if args:
+        sys.exit(0 if conn.chat(" ".join(args)) else 1)
+    interactive(conn)
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,15 @@ from .helpers import (
     handle_error,
     validate_response,
     format_provider_name,
+    split_path_argument,
     get_user_input,
     exit_application
 )
 
+from .async_stream import iterate_in_thread
+from .profiling import Profiler, span, timed, timed_iter
+from .telemetry import Telemetry, telemetry
+
 from .formatters import (
     format_markdown_stream,
     format_plain_stream,
@@ -16,9 +21,17 @@ __all__ = [
     'handle_error',
     'validate_response', 
     'format_provider_name',
+    'split_path_argument',
     'get_user_input',
     'exit_application',
     'format_markdown_stream',
     'format_plain_stream',
-    'extract_text_from_chunk'
+    'extract_text_from_chunk',
+    'iterate_in_thread',
+    'Profiler',
+    'span',
+    'timed',
+    'timed_iter',
+    'Telemetry',
+    'telemetry'
 ]
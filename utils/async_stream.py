@@ -0,0 +1,38 @@
+import asyncio
+from typing import AsyncIterator, Callable, Iterator
+
+_DONE = object()
+
+async def iterate_in_thread(factory: Callable[[], Iterator], executor=None) -> AsyncIterator:
+    """Jalankan iterator blocking di executor thread dan yield hasilnya secara async
+    
+    Iterator dihentikan (close) jika consumer berhenti di tengah jalan.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    cancelled = False
+
+    def pump():
+        iterator = factory()
+        try:
+            for item in iterator:
+                if cancelled:
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    future = loop.run_in_executor(executor, pump)
+    future.add_done_callback(lambda _: queue.put_nowait(_DONE))
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            yield item
+        # Lempar error dari iterator jika ada
+        future.result()
+    finally:
+        cancelled = True
@@ -0,0 +1,135 @@
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+from contextlib import closing
+
+# Perkiraan kasar yang sama dengan StreamStats
+CHARS_PER_TOKEN = 4
+# Jumlah term pertanyaan maksimum di query FTS
+MAX_QUERY_TERMS = 32
+INSERT_BATCH = 1000
+
+def attachment_id(path: str) -> str:
+    """ID stabil dari path, ukuran dan mtime (file berubah = index baru)"""
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+def iter_spans(mm, chunk_bytes: int):
+    """Yield (start, end) per chunk, dipotong di akhir baris jika memungkinkan"""
+    size = len(mm)
+    start = 0
+    while start < size:
+        end = min(start + chunk_bytes, size)
+        if end < size:
+            newline = mm.rfind(b"\n", start, end)
+            if newline > start:
+                end = newline + 1
+        yield start, end
+        start = end
+
+class Attachment:
+    """File besar yang di-index per chunk di SQLite FTS5 lokal
+
+    Isi file tidak pernah dimuat utuh: chunking dan pembacaan memakai mmap,
+    dan index hanya menyimpan posisi byte + term (tabel FTS contentless),
+    sehingga memori tetap kecil untuk file ratusan MB.
+    """
+
+    def __init__(self, path: str, index_dir: str, chunk_tokens: int = 500):
+        self.path = os.path.abspath(path)
+        self.name = os.path.basename(path)
+        self.id = attachment_id(path)
+        self.size = os.path.getsize(path)
+        self.chunk_bytes = max(chunk_tokens, 1) * CHARS_PER_TOKEN
+        os.makedirs(index_dir, exist_ok=True)
+        self.index_path = os.path.join(index_dir, f"{self.id}.db")
+        self.chunks = self._load_or_build()
+
+    def _load_or_build(self) -> int:
+        """Pakai index yang sudah ada, selain itu bangun index baru"""
+        if os.path.exists(self.index_path):
+            with closing(sqlite3.connect(self.index_path)) as db:
+                row = db.execute("SELECT value FROM meta WHERE key = 'chunks'").fetchone()
+                if row:
+                    return int(row[0])
+        return self._build()
+
+    def _build(self) -> int:
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        db = sqlite3.connect(tmp_path)
+        try:
+            db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            db.execute("CREATE TABLE spans (id INTEGER PRIMARY KEY, start INTEGER, end INTEGER, line INTEGER)")
+            db.execute("CREATE VIRTUAL TABLE terms USING fts5(text, content='')")
+            count = 0
+            if self.size:
+                with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    spans, texts, line = [], [], 1
+                    for start, end in iter_spans(mm, self.chunk_bytes):
+                        data = mm[start:end]
+                        count += 1
+                        spans.append((count, start, end, line))
+                        texts.append((count, data.decode("utf-8", errors="replace")))
+                        line += data.count(b"\n")
+                        if len(spans) >= INSERT_BATCH:
+                            self._insert(db, spans, texts)
+                            spans, texts = [], []
+                    self._insert(db, spans, texts)
+            db.execute("INSERT INTO meta VALUES ('chunks', ?)", (str(count),))
+            db.execute("INSERT INTO meta VALUES ('path', ?)", (self.path,))
+            db.commit()
+        finally:
+            db.close()
+        os.replace(tmp_path, self.index_path)
+        return count
+
+    def _insert(self, db, spans, texts):
+        db.executemany("INSERT INTO spans VALUES (?, ?, ?, ?)", spans)
+        db.executemany("INSERT INTO terms (rowid, text) VALUES (?, ?)", texts)
+
+    def search(self, question: str, max_tokens: int) -> list:
+        """Chunk paling relevan (BM25) untuk pertanyaan, dalam batas token
+
+        Return list (line, text) urut posisi di file. Jika tidak ada term
+        yang cocok, dipakai chunk awal file.
+        """
+        terms = list(dict.fromkeys(re.findall(r"\w{2,}", question.lower())))[:MAX_QUERY_TERMS]
+        limit = max(max_tokens * CHARS_PER_TOKEN // self.chunk_bytes, 1)
+        with closing(sqlite3.connect(self.index_path)) as db:
+            rows = []
+            if terms:
+                query = " OR ".join(f'"{term}"' for term in terms)
+                rows = db.execute(
+                    "SELECT spans.start, spans.end, spans.line FROM terms "
+                    "JOIN spans ON spans.id = terms.rowid "
+                    "WHERE terms MATCH ? ORDER BY bm25(terms) LIMIT ?",
+                    (query, limit)
+                ).fetchall()
+            if not rows:
+                rows = db.execute(
+                    "SELECT start, end, line FROM spans ORDER BY id LIMIT ?", (limit,)
+                ).fetchall()
+        if not rows:
+            return []
+        rows.sort()
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [(line, mm[start:end].decode("utf-8", errors="replace")) for start, end, line in rows]
+
+    def describe(self) -> str:
+        return f"{self.id}: {self.name} ({self.size / 1024 / 1024:.1f} MB, {self.chunks:,} chunk)"
+
+def build_context(attachments, question: str, max_tokens: int) -> str:
+    """Gabungkan chunk relevan dari semua lampiran menjadi konteks prompt"""
+    if not attachments:
+        return ""
+    per_attachment = max(max_tokens // len(attachments), 1)
+    sections = []
+    for attachment in attachments:
+        for line, text in attachment.search(question, per_attachment):
+            sections.append(f"[{attachment.name} @ baris {line}]\n```\n{text.rstrip()}\n```")
+    if not sections:
+        return ""
+    return "Potongan lampiran yang relevan:\n\n" + "\n\n".join(sections)
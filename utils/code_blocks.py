@@ -0,0 +1,201 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from rich.console import Group
+from rich.markdown import Markdown
+from rich.padding import Padding
+from rich.syntax import Syntax
+from rich.text import Text
+
+# Code block dengan jumlah baris >= ini dirender plain dulu, di-highlight belakangan
+LAZY_HIGHLIGHT_MIN_LINES = 40
+CODE_THEME = "monokai"
+
+FENCE_RE = re.compile(r"^( {0,3})(`{3,}|~{3,})([^\n`]*)$")
+LIST_ITEM_RE = re.compile(r"^ {0,3}([-+*]|\d{1,9}[.)])( |$)")
+# Link reference definition: "[1]: https://..."
+LINK_DEFINITION_RE = re.compile(r"^ {0,3}\[[^\]]+\]:\s*\S")
+
+class CodeBlock:
+    """Fenced code block hasil split dari teks markdown"""
+
+    def __init__(self, code: str, lexer: str, closed: bool):
+        self.code = code
+        self.lexer = lexer or "text"
+        self.closed = closed
+
+    @property
+    def line_count(self) -> int:
+        return self.code.count("\n") + 1
+
+    @property
+    def is_large(self) -> bool:
+        return self.line_count >= LAZY_HIGHLIGHT_MIN_LINES
+
+    @property
+    def cache_key(self):
+        return (self.code, self.lexer, CODE_THEME)
+
+def split_markdown(text: str) -> List:
+    """Split markdown menjadi potongan teks (str) dan CodeBlock besar
+    
+    Code block kecil dibiarkan di dalam teks supaya dirender Markdown biasa.
+    """
+    parts = []
+    buffer = []
+    lines = text.split("\n")
+    i = 0
+    while i < len(lines):
+        match = FENCE_RE.match(lines[i])
+        if not match:
+            buffer.append(lines[i])
+            i += 1
+            continue
+
+        fence = match.group(2)
+        body = []
+        j = i + 1
+        closed = False
+        while j < len(lines):
+            stripped = lines[j].strip()
+            if stripped.startswith(fence[0] * len(fence)) and not stripped.strip(fence[0]):
+                closed = True
+                break
+            body.append(lines[j])
+            j += 1
+
+        block = CodeBlock("\n".join(body), match.group(3).strip().split(" ")[0], closed)
+        if block.is_large:
+            if buffer:
+                parts.append("\n".join(buffer))
+                buffer = []
+            parts.append(block)
+        else:
+            buffer.extend(lines[i:j + 1])
+        i = j + 1
+
+    if buffer:
+        parts.append("\n".join(buffer))
+    return parts
+
+def split_blocks(text: str) -> List:
+    """Split markdown menjadi blok top-level (dipisah baris kosong) dan CodeBlock besar
+    
+    Blok yang sudah selesai tidak berubah saat stream bertambah, sehingga
+    hasil render-nya bisa di-cache per blok. Baris kosong di dalam fence,
+    sebelum baris ber-indent (lanjutan list) atau di antara item list
+    (loose list) tidak memisah blok. Link reference definition disalin ke
+    setiap blok supaya link `[teks][1]` tetap ter-resolve.
+    """
+    blocks = []
+    for part in split_markdown(text):
+        if isinstance(part, CodeBlock):
+            blocks.append(part)
+            continue
+        lines = part.split("\n")
+        current = []
+        fence = None
+        for i, line in enumerate(lines):
+            match = FENCE_RE.match(line)
+            if match:
+                marker = match.group(2)
+                if fence is None:
+                    fence = marker
+                elif marker[0] == fence[0] and len(marker) >= len(fence) and not match.group(3).strip():
+                    fence = None
+            if fence is None and not line.strip():
+                following = next((l for l in lines[i + 1:] if l.strip()), "")
+                in_list = LIST_ITEM_RE.match(following) and any(LIST_ITEM_RE.match(l) for l in current[:1])
+                if current and not following[:1].isspace() and not in_list:
+                    blocks.append("\n".join(current))
+                    current = []
+                    continue
+            current.append(line)
+        if any(line.strip() for line in current):
+            blocks.append("\n".join(current))
+    return _share_link_definitions(blocks)
+
+def _share_link_definitions(blocks: List) -> List:
+    """Tambahkan semua link reference definition ke setiap blok teks"""
+    definitions = []
+    for block in blocks:
+        if isinstance(block, str):
+            for line in block.strip("\n").split("\n"):
+                if not LINK_DEFINITION_RE.match(line):
+                    break
+                definitions.append(line)
+    if not definitions:
+        return blocks
+    suffix = "\n\n" + "\n".join(definitions)
+    shared = []
+    for block in blocks:
+        if isinstance(block, str):
+            if all(LINK_DEFINITION_RE.match(line) for line in block.strip("\n").split("\n")):
+                # Blok yang hanya berisi definition tidak dirender
+                continue
+            block += suffix
+        shared.append(block)
+    return shared
+
+class HighlightCache:
+    """LRU cache hasil highlight per code block (thread-safe untuk worker)"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, block: CodeBlock) -> Optional[Text]:
+        with self._lock:
+            text = self._items.get(block.cache_key)
+            if text is not None:
+                self._items.move_to_end(block.cache_key)
+            return text
+
+    def highlight(self, block: CodeBlock) -> Text:
+        """Highlight block, atau ambil dari cache jika sudah pernah"""
+        text = self.get(block)
+        if text is not None:
+            return text
+        text = Syntax(block.code, block.lexer, theme=CODE_THEME).highlight(block.code)
+        with self._lock:
+            self._items[block.cache_key] = text
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return text
+
+highlight_cache = HighlightCache()
+
+def render_code_block(block: CodeBlock, highlighted: Optional[Text] = None) -> Padding:
+    """Render code block: highlight jika tersedia, selain itu plain monospace"""
+    background = Syntax.get_theme(CODE_THEME).get_background_style()
+    text = highlighted.copy() if highlighted is not None else Text(block.code, style="markdown.code_block")
+    text.no_wrap = False
+    text.rstrip()
+    return Padding(text, 1, style=background)
+
+def build_markdown(text: str, highlight: bool = False) -> Group:
+    """Build renderable markdown dengan code block besar yang di-highlight secara lazy
+    
+    Jika `highlight` True, code block besar yang sudah tertutup di-highlight
+    sekarang; selain itu hanya hasil cache yang dipakai.
+    """
+    renderables = []
+    for part in split_markdown(text):
+        if isinstance(part, CodeBlock):
+            if highlight and part.closed:
+                highlighted = highlight_cache.highlight(part)
+            else:
+                highlighted = highlight_cache.get(part)
+            renderables.append(render_code_block(part, highlighted))
+        elif part.strip():
+            renderables.append(Markdown(part, code_theme=CODE_THEME))
+    return Group(*renderables)
+
+def pending_highlight_blocks(text: str) -> List[CodeBlock]:
+    """Code block besar yang sudah tertutup tapi belum di-highlight"""
+    return [
+        part for part in split_markdown(text)
+        if isinstance(part, CodeBlock) and part.closed and highlight_cache.get(part) is None
+    ]
@@ -1,28 +1,31 @@
 from rich.console import Console
-from rich.markdown import Markdown
+from .code_blocks import build_markdown
+from .profiling import timed, timed_iter
 from rich.live import Live
 from rich.text import Text
 from typing import Generator, Any
 
+@timed("format_markdown_stream", "render")
 def format_markdown_stream(console: Console, stream: Generator, style: str = "cyan") -> str:
     """Format streaming response with markdown"""
     full_response = ""
     accumulated_text = ""
     
     with Live(console=console, refresh_per_second=10) as live:
-        for chunk in stream:
+        for chunk in timed_iter(stream):
             text_chunk = extract_text_from_chunk(chunk)
             if text_chunk:
                 full_response += text_chunk
                 accumulated_text += text_chunk
                 try:
-                    md = Markdown(accumulated_text)
+                    # Code block besar tetap plain selama streaming
+                    md = build_markdown(accumulated_text)
                     live.update(md)
                 except Exception:
                     live.update(Text(accumulated_text, style=style))
         
-        # Final render
-        md = Markdown(full_response)
+        # Final render, code block besar di-highlight sekali (dan di-cache)
+        md = build_markdown(full_response, highlight=True)
         live.update(md)
     
     return full_response
@@ -32,7 +35,7 @@ def format_plain_stream(console: Console, stream: Generator, style: str = "cyan"
     full_response = ""
     
     console.print(f"[italic {style}]", end="")
-    for chunk in stream:
+    for chunk in timed_iter(stream):
         text_chunk = extract_text_from_chunk(chunk)
         if text_chunk:
             print(text_chunk, end="", flush=True)
@@ -43,6 +46,10 @@ def format_plain_stream(console: Console, stream: Generator, style: str = "cyan"
 
 def extract_text_from_chunk(chunk: Any) -> str:
     """Extract text from different AI provider chunks"""
+    # Text deltas yang sudah diekstrak
+    if isinstance(chunk, str):
+        return chunk
+    
     # Gemini chunks
     if hasattr(chunk, 'text') and chunk.text:
         return chunk.text
@@ -21,6 +21,15 @@ def format_provider_name(provider: str) -> str:
     """Format provider name for display"""
     return provider.upper()
 
+def split_path_argument(arg: str):
+    """'<path> <sisa>' -> (path, sisa); path boleh diberi tanda kutip"""
+    arg = arg.strip()
+    if arg[:1] in ("'", '"') and arg.find(arg[0], 1) > 0:
+        end = arg.find(arg[0], 1)
+        return arg[1:end], arg[end + 1:].strip()
+    path, _, rest = arg.partition(" ")
+    return path, rest.strip()
+
 def get_user_input(prompt: str = "👤 You: ") -> str:
     """Get user input with consistent prompt"""
     return input(f"\n{prompt}").strip()
@@ -0,0 +1,286 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime
+from .telemetry import telemetry
+
+# Timing span hanya aktif saat --profile; saat mati, span() mengembalikan
+# nullcontext bersama dan timed() hanya menambah satu cek boolean
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}
+_NULL_SPAN = nullcontext()
+
+def is_enabled() -> bool:
+    return _enabled
+
+class _Span:
+    """Timing span; waktu child dikurangkan dari self time parent"""
+
+    __slots__ = ("name", "category", "start", "child_time")
+
+    def __init__(self, name: str, category: str):
+        self.name = name
+        self.category = category
+        self.child_time = 0.0
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _local.stack
+        stack.pop()
+        if stack:
+            stack[-1].child_time += elapsed
+        _record(self.name, self.category, elapsed, elapsed - self.child_time)
+        return False
+
+def _record(name: str, category: str, total: float, self_time: float):
+    with _lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = {"category": category, "count": 0, "total": 0.0, "self": 0.0, "max": 0.0}
+        entry["count"] += 1
+        entry["total"] += total
+        entry["self"] += self_time
+        entry["max"] = max(entry["max"], total)
+
+def span(name: str, category: str = "app"):
+    """Context manager timing span (no-op jika profiling mati)"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category)
+
+def timed(name: str, category: str = "app"):
+    """Decorator timing span untuk hot path"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def timed_iter(iterable, name: str = "network.wait", category: str = "network"):
+    """Ukur waktu menunggu item berikutnya dari stream (network wait)"""
+    if not _enabled:
+        return iterable
+    return _timed_iter(iter(iterable), name, category)
+
+def _timed_iter(iterator, name: str, category: str):
+    while True:
+        with _Span(name, category):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+def span_stats() -> dict:
+    with _lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
+
+class SamplingProfiler:
+    """Sampling stack semua thread lewat sys._current_frames (fallback cProfile)"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+        self._self = {}
+        self._cumulative = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="terai-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                self.samples += 1
+                leaf = True
+                seen = set()
+                while frame is not None:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if leaf:
+                        self._self[key] = self._self.get(key, 0) + 1
+                        leaf = False
+                    if key not in seen:
+                        seen.add(key)
+                        self._cumulative[key] = self._cumulative.get(key, 0) + 1
+                    frame = frame.f_back
+
+    def report(self) -> str:
+        out = io.StringIO()
+        for title, counts in (("self", self._self), ("cumulative", self._cumulative)):
+            out.write(f"== Sampling top 40 ({title}, sampel per {self.interval * 1000:g} ms) ==\n")
+            for (filename, lineno, name), count in sorted(counts.items(), key=lambda item: -item[1])[:40]:
+                out.write(f"  {count:>7}  {name} ({filename}:{lineno})\n")
+            out.write("\n")
+        return out.getvalue()
+
+class Profiler:
+    """Profiling satu sesi Terai: cProfile (semua thread), tracemalloc dan timing span
+    
+    Python 3.12+ memakai satu cProfile yang sudah mencakup semua thread
+    (sys.monitoring); versi lama memasang cProfile per thread. Jika profiler
+    lain sudah aktif, dipakai sampling profiler sebagai gantinya.
+    Report ditulis ke file teks saat `stop()` dipanggil.
+    """
+
+    def __init__(self, output_dir: str = "."):
+        self.output_dir = output_dir
+        self._profiles = []
+        self._sampler = None
+        self._started_at = None
+
+    def start(self):
+        global _enabled
+        self._started_at = time.perf_counter()
+        _enabled = True
+        tracemalloc.start(10)
+        try:
+            self._start_thread_profile()
+        except ValueError:
+            # "Another profiling tool is already active"
+            self._sampler = SamplingProfiler()
+            self._sampler.start()
+            return
+        if sys.version_info < (3, 12):
+            # Thread baru (executor, worker Textual) mendapat profiler sendiri
+            threading.setprofile(self._start_thread_profile)
+
+    def _start_thread_profile(self, *args):
+        profile = cProfile.Profile()
+        profile.enable()
+        with _lock:
+            self._profiles.append(profile)
+
+    def stop(self) -> str:
+        """Hentikan profiling dan tulis report; return path report"""
+        global _enabled
+        _enabled = False
+        if sys.version_info < (3, 12):
+            threading.setprofile(None)
+        for profile in self._profiles:
+            profile.disable()
+        if self._sampler:
+            self._sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(
+            self.output_dir,
+            f"terai-profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report(snapshot))
+        return path
+
+    def _merged_stats(self) -> pstats.Stats:
+        stats = None
+        for profile in self._profiles:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile, stream=io.StringIO())
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # Profile thread tanpa data
+                continue
+        return stats
+
+    def report(self, snapshot) -> str:
+        """Build report teks"""
+        wall = time.perf_counter() - self._started_at
+        out = io.StringIO()
+        out.write(f"Terai profile - {datetime.now().isoformat(timespec='seconds')}\n")
+        if self._sampler:
+            out.write(f"Wall time: {wall:.3f}s, sampling profiler ({self._sampler.samples} sampel)\n\n")
+        else:
+            out.write(f"Wall time: {wall:.3f}s, profile cProfile: {len(self._profiles)}\n\n")
+
+        out.write("== Timing span (self time = tanpa child span) ==\n")
+        out.write(f"{'span':<40} {'kategori':<9} {'count':>7} {'total s':>10} {'self s':>10} {'max ms':>9}\n")
+        spans = span_stats()
+        for name, entry in sorted(spans.items(), key=lambda item: -item[1]["total"]):
+            out.write(
+                f"{name:<40} {entry['category']:<9} {entry['count']:>7} "
+                f"{entry['total']:>10.3f} {entry['self']:>10.3f} {entry['max'] * 1000:>9.1f}\n"
+            )
+        by_category = {}
+        for entry in spans.values():
+            by_category[entry["category"]] = by_category.get(entry["category"], 0.0) + entry["self"]
+        out.write("\nSelf time per kategori: " + ", ".join(
+            f"{category} {seconds:.3f}s" for category, seconds in sorted(by_category.items())
+        ) + "\n\n")
+
+        counters = telemetry.snapshot()
+        if counters:
+            out.write("== Telemetry ==\n")
+            for name, value in sorted(counters.items()):
+                out.write(f"  {name:<24} {value:>8}\n")
+            out.write("\n")
+
+        stats = self._merged_stats()
+        if stats is not None:
+            out.write("== CPU time per paket (cProfile tottime, semua thread) ==\n")
+            for bucket, seconds in sorted(self._package_times(stats).items(), key=lambda item: -item[1]):
+                out.write(f"  {bucket:<12} {seconds:>10.3f}s\n")
+            out.write("\n== cProfile top 40 (cumulative) ==\n")
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(40)
+
+        if self._sampler:
+            out.write(self._sampler.report())
+
+        out.write("\n== tracemalloc top 15 ==\n")
+        for stat in snapshot.statistics("lineno")[:15]:
+            out.write(f"  {stat}\n")
+        return out.getvalue()
+
+    def _package_times(self, stats: pstats.Stats) -> dict:
+        """Kelompokkan tottime: kode Terai, Rich, Textual, SDK/network, lainnya"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        buckets = {}
+        for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+            path = filename.replace("\\", "/")
+            if "/rich/" in path:
+                bucket = "rich"
+            elif "/textual/" in path:
+                bucket = "textual"
+            elif any(name in path for name in ("/httpx/", "/httpcore/", "/openai/", "/google/", "/ssl.py", "/socket.py")):
+                bucket = "sdk/network"
+            elif path.startswith(root) and "site-packages" not in path:
+                bucket = "terai"
+            else:
+                bucket = "lainnya"
+            buckets[bucket] = buckets.get(bucket, 0.0) + tottime
+        return buckets
@@ -0,0 +1,52 @@
+import time
+
+# Perkiraan kasar saat provider tidak mengirim usage
+CHARS_PER_TOKEN = 4
+
+class StreamStats:
+    """Statistik satu response: time-to-first-token, tokens/sec dan usage"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.ended = None
+        self.chars = 0
+        self.usage = None
+
+    def on_chunk(self, text: str):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.chars += len(text)
+
+    def finish(self):
+        self.ended = time.perf_counter()
+
+    @property
+    def ttft(self) -> float:
+        return (self.first_token_at - self.started) if self.first_token_at else 0.0
+
+    @property
+    def completion_tokens(self) -> int:
+        if self.usage and self.usage.completion_tokens:
+            return self.usage.completion_tokens
+        return self.chars // CHARS_PER_TOKEN
+
+    @property
+    def usage_is_estimate(self) -> bool:
+        return not (self.usage and self.usage.completion_tokens)
+
+    @property
+    def tokens_per_sec(self) -> float:
+        if not self.first_token_at:
+            return 0.0
+        end = self.ended or time.perf_counter()
+        elapsed = end - self.first_token_at
+        return self.completion_tokens / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """Ringkasan satu baris untuk UI"""
+        approx = "~" if self.usage_is_estimate else ""
+        text = f"TTFT {self.ttft:.2f}s • {self.tokens_per_sec:.0f} tok/s • {approx}{self.completion_tokens} token"
+        if self.usage and self.usage.prompt_tokens:
+            text += f" (prompt {self.usage.prompt_tokens})"
+        return text
@@ -0,0 +1,27 @@
+import threading
+
+class Telemetry:
+    """Counter sederhana dan thread-safe untuk statistik runtime"""
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+# Instance global, dibaca oleh 'config' dan report --profile
+telemetry = Telemetry()